@@ -0,0 +1,208 @@
+"""
+Upload size limits and admission control for the analysis endpoints.
+
+UploadGuardMiddleware runs before the request body is read: a Content-Length
+above the route's limit is rejected with 413 at once, and bodies without one
+are counted as they stream in and cut off at the limit.
+
+Once an upload has been received, its analysis needs one of
+RESUMEIQ_MAX_INFLIGHT slots (AdmissionController.slot). When none frees up
+within RESUMEIQ_ADMISSION_WAIT seconds the upload is shed with 429 and a
+Retry-After header instead of slowing every request down. Slots are taken
+after the transfer so slow clients do not hold them; an analysis mostly waits
+on JSearch and OpenAI, so the default allows many more than there are CPUs.
+
+Admission bounds analyses, not memory. The upload endpoints read the whole
+file before asking for a slot, and at most RESUMEIQ_MAX_INFLIGHT uploads wait
+for one, so about twice that many bodies of at most RESUMEIQ_MAX_UPLOAD_BYTES
+each are held by admitted or waiting analyses. Uploads still being received
+(spooled to disk by the multipart parser above 1 MB) and the up to
+RESUMEIQ_QUEUE_SIZE bodies queued at /analyses/ come on top of that.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from backend.metrics import Counter, Gauge
+from backend.startup import available_cpus
+
+logger = logging.getLogger(__name__)
+
+# Largest resume accepted by /upload_resume/ and /analyses/
+MAX_UPLOAD_BYTES = int(os.getenv("RESUMEIQ_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Largest request accepted by /batch_upload/ (all files and archives together)
+MAX_BATCH_BYTES = int(os.getenv("RESUMEIQ_MAX_BATCH_BYTES", str(100 * 1024 * 1024)))
+# Analyses admitted at once per worker; further uploads wait briefly, then get 429.
+# CPU work is bounded by the process pool, so the limit is about memory and upstream waits.
+MAX_INFLIGHT = int(os.getenv("RESUMEIQ_MAX_INFLIGHT", str(max(16, 8 * available_cpus()))))
+ADMISSION_WAIT = float(os.getenv("RESUMEIQ_ADMISSION_WAIT", "2"))
+# Multipart boundaries and headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Request body limit per route
+UPLOAD_LIMITS: Dict[str, int] = {
+    "/upload_resume/": MAX_UPLOAD_BYTES,
+    "/analyses/": MAX_UPLOAD_BYTES,
+    "/batch_upload/": MAX_BATCH_BYTES,
+}
+
+rejected_uploads = Counter(
+    "resumeiq_rejected_uploads_total", "Uploads refused before analysis", ("reason",))
+
+
+class AdmissionRejected(Exception):
+    """Raised when no analysis slot frees up in time"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Server is at capacity")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Counts analyses in flight and sheds load above the limit"""
+
+    def __init__(self, limit: int = MAX_INFLIGHT, max_wait: float = ADMISSION_WAIT):
+        self.limit = limit
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.waiting = 0
+        self._durations: List[float] = []
+        self._changed: Optional[asyncio.Condition] = None
+        self._loop = None
+
+    def _condition(self) -> asyncio.Condition:
+        # Conditions belong to the loop they were first used on
+        loop = asyncio.get_running_loop()
+        if self._changed is None or self._loop is not loop:
+            self._changed = asyncio.Condition()
+            self._loop = loop
+        return self._changed
+
+    async def acquire(self):
+        """Take an analysis slot, waiting up to max_wait; raises AdmissionRejected"""
+        changed = self._condition()
+        async with changed:
+            if self.in_flight >= self.limit:
+                # Shed at once when the waiting line alone would fill the next batch of slots
+                if self.waiting >= self.limit or self.max_wait <= 0:
+                    raise AdmissionRejected(self.retry_after())
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(changed.wait_for(lambda: self.in_flight < self.limit), self.max_wait)
+                except asyncio.TimeoutError:
+                    raise AdmissionRejected(self.retry_after()) from None
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self, duration: float):
+        changed = self._condition()
+        async with changed:
+            self.in_flight -= 1
+            self._durations = self._durations[-19:] + [duration]
+            changed.notify()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold an analysis slot for the block; raises AdmissionRejected when none frees up"""
+        await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            await self.release(time.perf_counter() - start)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, from recent analysis durations"""
+        recent = self._durations
+        average = sum(recent) / len(recent) if recent else 5.0
+        return max(1, int(average * (self.waiting + 1) / self.limit + 0.5))
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": self.waiting}
+
+
+admission = AdmissionController()
+
+analyses_in_flight = Gauge(
+    "resumeiq_analyses_in_flight", "Uploads holding an analysis slot", function=lambda: admission.in_flight)
+
+
+class UploadTooLarge(Exception):
+    """Raised from the request body stream once it exceeds the route's limit"""
+
+
+async def _send_error(send, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+    body = json.dumps({"error": message}).encode()
+    raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    raw_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _too_large_message(limit: int) -> str:
+    size = f"{limit / (1024 * 1024):g} MB" if limit >= 1024 * 1024 else f"{limit / 1024:g} KB"
+    return f"The upload is larger than the {size} limit"
+
+
+class UploadGuardMiddleware:
+    """ASGI middleware enforcing UPLOAD_LIMITS"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in UPLOAD_LIMITS:
+            return await self.app(scope, receive, send)
+
+        limit = UPLOAD_LIMITS[scope["path"]]
+        body_limit = limit + MULTIPART_OVERHEAD
+        headers = dict(scope["headers"])
+        try:
+            declared = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            declared = 0
+        if declared > body_limit:
+            rejected_uploads.inc(reason="too_large")
+            return await _send_error(send, 413, _too_large_message(limit))
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > body_limit:
+                    exceeded = True
+                    raise UploadTooLarge(_too_large_message(limit))
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                # The app answers the aborted body with a parsing error; answer 413 instead
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await _send_error(send, 413, _too_large_message(limit))
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            if response_started:
+                raise
+            response_started = True
+            await _send_error(send, 413, _too_large_message(limit))
+        finally:
+            if exceeded:
+                rejected_uploads.inc(reason="too_large")
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the response schema changes in a way the source fingerprint would not catch
+ANALYSIS_CACHE_VERSION = 1
+# SQLite file for the cache; unset keeps it in memory for the lifetime of the process
+ANALYSIS_CACHE_DB = os.getenv("ANALYSIS_CACHE_DB")
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Job listings inside a cached response go out of date, so entries expire as well
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "86400"))
+
+# Modules whose logic decides the content of an analysis response
+_FINGERPRINT_MODULES = (
+    "document.py", "extraction.py", "job_ranking.py", "name_extraction.py", "pdf_extraction.py", "pipeline.py",
+    "resume_parser.py", "ocr.py", "scoring.py", "skill_matcher.py", "suggestions.py",
+)
+
+
+def analysis_fingerprint() -> str:
+    """
+    Version tag for cached analyses.
+
+    Hashes the explicit cache version together with the source of the analysis
+    modules, so editing score_resume weights or the suggestion logic invalidates
+    every previously cached result without a manual version bump.
+    """
+    digest = hashlib.sha256(str(ANALYSIS_CACHE_VERSION).encode())
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in _FINGERPRINT_MODULES:
+        try:
+            with open(os.path.join(backend_dir, name), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(name.encode())
+    return digest.hexdigest()[:16]
+
+
+class AnalysisCache:
+    """
+    Content-addressed store of full analysis responses.
+
+    Keys are the SHA-256 of the uploaded bytes plus the file extension. The store
+    is bounded by the total size of the serialized responses and evicts the least
+    recently used entries first.
+    """
+
+    def __init__(self, db_path: Optional[str] = ANALYSIS_CACHE_DB,
+                 max_bytes: int = ANALYSIS_CACHE_MAX_BYTES, ttl: float = ANALYSIS_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = analysis_fingerprint()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self.db_path = db_path
+        self._connect()
+
+    def _connect(self):
+        try:
+            self._db = sqlite3.connect(self.db_path or ":memory:", check_same_thread=False, timeout=1)
+        except sqlite3.Error as e:
+            logger.warning(f"Analysis cache database unavailable, using memory: {str(e)}")
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        if self.db_path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            "key TEXT PRIMARY KEY, version TEXT, stored_at REAL, accessed_at REAL, "
+            "size INTEGER, response TEXT)"
+        )
+        # Results from other versions of the analysis code can never be served again
+        self._db.execute("DELETE FROM analysis_cache WHERE version != ?", (self.version,))
+        self._db.commit()
+
+    def reopen(self):
+        """Open a new connection in a forked worker; SQLite connections must not cross a fork"""
+        self._lock = threading.Lock()
+        self._connect()
+
+    @staticmethod
+    def key_for(contents: bytes, filename: str) -> str:
+        ext = filename.split('.')[-1].lower()
+        return f"{hashlib.sha256(contents).hexdigest()}.{ext}"
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT stored_at, response FROM analysis_cache WHERE key = ? AND version = ?",
+                    (key, self.version)
+                ).fetchone()
+                if row is None or time.time() - row[0] > self.ttl:
+                    self._counters["misses"] += 1
+                    return None
+                self._db.execute("UPDATE analysis_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Analysis cache read failed: {str(e)}")
+                return None
+            self._counters["hits"] += 1
+            return json.loads(row[1])
+
+    def set(self, key: str, response: dict):
+        payload = json.dumps(response)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis_cache "
+                    "(key, version, stored_at, accessed_at, size, response) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, self.version, now, now, len(payload), payload)
+                )
+                self._evict()
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Analysis cache write failed: {str(e)}")
+
+    def _evict(self):
+        """Drop least recently used entries until the store fits in max_bytes"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+            "SELECT key, size FROM analysis_cache ORDER BY accessed_at"
+        ).fetchall():
+            self._db.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+            self._counters["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache"
+            ).fetchone()
+        counters.update({"entries": entries, "bytes": size, "version": self.version})
+        return counters
+
+
+analysis_cache = AnalysisCache()
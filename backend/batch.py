@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import os
+import zipfile
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Tuple
+
+from backend.executor import PROCESS_WORKERS, run_in_thread
+from backend.extraction import is_supported
+from backend.pipeline import analyze_resume
+
+logger = logging.getLogger(__name__)
+
+# Resumes analyzed at the same time within one batch; also bounds how many
+# uploaded files are held in memory at once
+BATCH_CONCURRENCY = int(os.getenv("RESUMEIQ_BATCH_CONCURRENCY", max(PROCESS_WORKERS, 1) * 2))
+# Members of a ZIP archive larger than this (uncompressed) are rejected unread
+BATCH_MAX_FILE_BYTES = int(os.getenv("RESUMEIQ_BATCH_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+
+# A batch item is a file name and a coroutine function that reads its bytes on demand
+BatchItem = Tuple[str, Callable[[], Awaitable[bytes]]]
+
+
+def upload_items(files) -> List[BatchItem]:
+    """
+    Turn uploaded files into batch items, expanding ZIP archives member by member.
+
+    Only archive directories are read here, which is blocking file I/O, so call
+    it through run_in_thread; every item reads its own bytes when it is processed.
+    """
+    items: List[BatchItem] = []
+    for upload in files:
+        if upload.filename.lower().endswith(".zip"):
+            items.extend(_iter_zip_items(upload))
+        else:
+            items.append((upload.filename, upload.read))
+    return items
+
+
+def _iter_zip_items(upload) -> Iterator[BatchItem]:
+    try:
+        archive = zipfile.ZipFile(upload.file)
+    except zipfile.BadZipFile:
+        yield upload.filename, _raise(ValueError("Not a valid ZIP archive"))
+        return
+
+    for info in archive.infolist():
+        name = info.filename
+        if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+            continue
+        ext = name.split('.')[-1].lower()
+        if not is_supported(ext):
+            continue
+        if info.file_size > BATCH_MAX_FILE_BYTES:
+            yield name, _raise(ValueError(f"File exceeds the {BATCH_MAX_FILE_BYTES} byte limit"))
+            continue
+        yield name, _zip_reader(archive, info)
+
+
+def _zip_reader(archive: zipfile.ZipFile, info: zipfile.ZipInfo):
+    async def read() -> bytes:
+        return await run_in_thread(archive.read, info)
+    return read
+
+
+def _raise(error: Exception):
+    async def read() -> bytes:
+        raise error
+    return read
+
+
+async def _analyze_item(index: int, item: BatchItem) -> dict:
+    filename, read = item
+    try:
+        contents = await read()
+        result = await analyze_resume(contents, filename)
+    except Exception as e:
+        logger.error(f"Error processing {filename} in batch: {str(e)}")
+        result = {"error": f"Error processing resume: {str(e)}"}
+    return {"index": index, "filename": filename, **result}
+
+
+async def analyze_batch(items: Iterable[BatchItem], concurrency: int = BATCH_CONCURRENCY) -> AsyncIterator[dict]:
+    """
+    Analyze batch items in parallel and yield one record per resume as each finishes.
+
+    At most `concurrency` items are read and analyzed at a time, so memory stays
+    bounded however many items the batch holds. Records carry the same fields
+    upload_resume returns, plus the item's index and file name.
+    """
+    items = enumerate(items)
+    pending = set()
+
+    def refill():
+        while len(pending) < concurrency:
+            nxt = next(items, None)
+            if nxt is None:
+                return
+            pending.add(asyncio.create_task(_analyze_item(*nxt)))
+
+    refill()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                yield task.result()
+            refill()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def stream_ndjson(records: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """One JSON object per line"""
+    async for record in records:
+        yield json.dumps(record) + "\n"
+
+
+async def stream_sse(records: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """Server-sent events: one "result" event per resume, then a "done" event"""
+    count = 0
+    async for record in records:
+        count += 1
+        yield f"event: result\ndata: {json.dumps(record)}\n\n"
+    yield f"event: done\ndata: {json.dumps({'count': count})}\n\n"
@@ -0,0 +1,255 @@
+"""
+Bulk scoring of resume corpora with sparse matrix operations.
+
+Resumes are encoded once as a sparse resume x skill matrix; scores, category
+counts and missing skills for the whole corpus then come out of a handful of
+NumPy/SciPy operations instead of one score_resume call per row.
+
+Usage:
+    python -m backend.bulk_scoring resume_dataset/01_people.csv -o scores.parquet
+
+The input can also be a corpus store (see backend.corpus_store); its
+dictionary-encoded text column is scored once per distinct value.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, List
+
+import numpy as np
+from scipy import sparse
+
+from backend.resume_parser import SKILL_MATCHER
+from backend.scoring import MARKET_SKILLS, MAX_POSSIBLE_SCORE, TOP_SKILLS
+from backend.startup import available_cpus
+
+# Parquet output is optional - fall back to compressed NumPy archives without pyarrow
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Matrix columns are the market skills, in MARKET_SKILLS order
+SKILL_COLUMNS: List[str] = list(MARKET_SKILLS)
+SKILL_WEIGHTS = np.array([MARKET_SKILLS[skill]['weight'] for skill in SKILL_COLUMNS], dtype=np.float64)
+CATEGORIES: List[str] = sorted({info['category'] for info in MARKET_SKILLS.values()})
+# skill x category indicator matrix
+CATEGORY_MATRIX = sparse.csr_matrix(
+    (
+        np.ones(len(SKILL_COLUMNS), dtype=np.int32),
+        (np.arange(len(SKILL_COLUMNS)), [CATEGORIES.index(MARKET_SKILLS[s]['category']) for s in SKILL_COLUMNS])
+    ),
+    shape=(len(SKILL_COLUMNS), len(CATEGORIES))
+)
+# Columns of the top skills, in the order score_resume reports missing skills
+TOP_SKILL_COLUMNS = np.array([SKILL_COLUMNS.index(skill) for skill, _ in TOP_SKILLS])
+
+# Skill matcher keyword index -> matrix column (-1 for skills without a market weight)
+_KEYWORD_TO_COLUMN = np.array(
+    [SKILL_COLUMNS.index(k) if k in MARKET_SKILLS else -1 for k in SKILL_MATCHER.keywords]
+)
+
+
+# Every skill the parser recognises, in matcher order; the skill index has a posting list for each
+KEYWORD_COLUMNS: List[str] = list(SKILL_MATCHER.keywords)
+# keyword x market-skill indicator matrix, selecting the scored columns of a keyword matrix
+_SCORED_KEYWORDS = np.flatnonzero(_KEYWORD_TO_COLUMN >= 0)
+KEYWORD_MARKET_MATRIX = sparse.csr_matrix(
+    (np.ones(len(_SCORED_KEYWORDS), dtype=np.int8), (_SCORED_KEYWORDS, _KEYWORD_TO_COLUMN[_SCORED_KEYWORDS])),
+    shape=(len(KEYWORD_COLUMNS), len(SKILL_COLUMNS))
+)
+
+
+def encode_texts(texts: Iterable[str]) -> sparse.csr_matrix:
+    """
+    Encode resume texts as a binary resume x market-skill matrix.
+
+    Skills are found with the same single-pass matcher extract_resume_data uses.
+    """
+    indptr = [0]
+    indices: List[int] = []
+    column_of = _KEYWORD_TO_COLUMN
+    for text in texts:
+        columns = {column_of[index] for index, _ in SKILL_MATCHER.scan(text.lower())} if text else ()
+        indices.extend(column for column in columns if column >= 0)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int8)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(SKILL_COLUMNS)))
+    matrix.sort_indices()
+    return matrix
+
+
+def encode_keywords(texts: Iterable[str]) -> sparse.csr_matrix:
+    """Encode resume texts as a binary resume x keyword matrix over every skill in KEYWORD_COLUMNS"""
+    indptr = [0]
+    indices: List[int] = []
+    for text in texts:
+        if text:
+            indices.extend(sorted({index for index, _ in SKILL_MATCHER.scan(text.lower())}))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int8)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(KEYWORD_COLUMNS)))
+
+
+def market_columns(keyword_matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """The market-skill matrix encode_texts gives for the same texts, from their keyword matrix"""
+    matrix = (keyword_matrix @ KEYWORD_MARKET_MATRIX).tocsr()
+    matrix.sort_indices()
+    return matrix
+
+
+def encode_skill_lists(skill_lists: Iterable[List[str]]) -> sparse.csr_matrix:
+    """Encode already-extracted skill lists (as returned by extract_resume_data)"""
+    indptr = [0]
+    indices: List[int] = []
+    lookup = {skill: column for column, skill in enumerate(SKILL_COLUMNS)}
+    for skills in skill_lists:
+        columns = {lookup[s.lower()] for s in skills if s.lower() in lookup}
+        indices.extend(sorted(columns))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int8)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(SKILL_COLUMNS)))
+
+
+def score_matrix(matrix: sparse.csr_matrix) -> Dict[str, np.ndarray]:
+    """
+    Score every row of a resume x skill matrix.
+
+    Returns:
+        dict: Column name -> array of n values. "score" matches score_resume,
+              "category:<name>" holds the number of matched skills per category,
+              "skills" and "missing_skills" are ", "-joined skill names, with
+              missing skills limited to the top 5 as in score_resume.
+    """
+    n = matrix.shape[0]
+    matrix = matrix.astype(np.float64)
+    totals = matrix @ SKILL_WEIGHTS
+    scores = np.minimum(((totals / MAX_POSSIBLE_SCORE) * 100).astype(np.int64), 100)
+
+    columns: Dict[str, np.ndarray] = {"score": scores}
+    category_counts = (matrix @ CATEGORY_MATRIX).toarray().astype(np.int16)
+    for k, category in enumerate(CATEGORIES):
+        columns[f"category:{category}"] = category_counts[:, k]
+
+    # Missing skills: the first five top skills each row does not have
+    has_top = matrix[:, TOP_SKILL_COLUMNS].toarray() > 0
+    missing = ~has_top
+    missing &= np.cumsum(missing, axis=1) <= 5
+    columns["missing_skills"] = _join_names(missing, [SKILL_COLUMNS[c] for c in TOP_SKILL_COLUMNS])
+    columns["skills"] = _join_csr(matrix.tocsr(), SKILL_COLUMNS, n)
+    return columns
+
+
+def _join_names(mask: np.ndarray, names: List[str]) -> np.ndarray:
+    """Join the names selected by a boolean row mask into one string per row"""
+    rows, cols = np.nonzero(mask)
+    return _group_names(rows, cols, names, mask.shape[0])
+
+
+def _join_csr(matrix: sparse.csr_matrix, names: List[str], n: int) -> np.ndarray:
+    rows = np.repeat(np.arange(n), np.diff(matrix.indptr))
+    return _group_names(rows, matrix.indices, names, n)
+
+
+def _group_names(rows: np.ndarray, cols: np.ndarray, names: List[str], n: int) -> np.ndarray:
+    name_array = np.array(names, dtype=object)
+    out = np.full(n, "", dtype=object)
+    if len(rows):
+        bounds = np.flatnonzero(np.diff(rows)) + 1
+        starts = np.concatenate(([0], bounds))
+        for start, group in zip(starts, np.split(name_array[cols], bounds)):
+            out[rows[start]] = ", ".join(group)
+    return out
+
+
+def score_texts(texts: List[str]) -> Dict[str, np.ndarray]:
+    """Encode and score a list of resume texts"""
+    return score_matrix(encode_texts(texts))
+
+
+def score_dictionary(codes: np.ndarray, values: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Score a dictionary-encoded text column: every distinct text is scored
+    once and the results are gathered by code (-1 scores as an empty text).
+    """
+    distinct = score_texts(list(values) + [""])
+    codes = np.asarray(codes)
+    return {name: column[codes] for name, column in distinct.items()}
+
+
+def score_corpus_column(column) -> Dict[str, np.ndarray]:
+    """Score a pandas text column, using its dictionary when it is categorical"""
+    import pandas as pd
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return score_dictionary(column.cat.codes.to_numpy(), column.cat.categories.tolist())
+    return score_texts(column.fillna("").astype(str).tolist())
+
+
+def name_corpus_column(column, n_process: int = 1) -> np.ndarray:
+    """Candidate names for a pandas text column, found once per distinct text when it is categorical"""
+    import pandas as pd
+    from backend.name_extraction import extract_names
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        names = np.array(extract_names(column.cat.categories.tolist(), n_process) + [""], dtype=object)
+        return names[column.cat.codes.to_numpy()]
+    return np.array(extract_names(column.fillna("").astype(str).tolist(), n_process), dtype=object)
+
+
+def write_columns(columns: Dict[str, np.ndarray], path: str):
+    """Write result columns as Parquet (.parquet) or a compressed NumPy archive (.npz)"""
+    if path.endswith(".parquet"):
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Writing Parquet requires pyarrow; install it or use an .npz output path")
+        import pandas as pd
+        pd.DataFrame(columns).to_parquet(path, index=False)
+    elif path.endswith(".npz"):
+        np.savez_compressed(path, **{
+            name: values.astype(str) if values.dtype == object else values
+            for name, values in columns.items()
+        })
+    else:
+        raise ValueError("Output path must end in .parquet or .npz")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every resume in a CSV corpus")
+    parser.add_argument("input", help="CSV file, Parquet file or corpus store directory, e.g. resume_dataset/01_people.csv")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output .parquet or .npz file (default: <input>.scores.parquet or .npz)")
+    parser.add_argument("--text-column", default="name", help="Column holding the resume text")
+    parser.add_argument("--id-column", default="person_id", help="Column copied into the output as the row id")
+    parser.add_argument("--names", action="store_true", help="Add a column with each candidate's name")
+    parser.add_argument("--name-processes", type=int, default=available_cpus(),
+                        help="Processes spaCy uses for names the resume header does not give away")
+    args = parser.parse_args(argv)
+
+    from backend.corpus_store import read_corpus
+
+    base = os.path.splitext(args.input.rstrip(os.sep))[0]
+    output = args.output or base + (".scores.parquet" if PARQUET_AVAILABLE else ".scores.npz")
+    started = time.perf_counter()
+    frame = read_corpus(args.input, [args.id_column, args.text_column])
+    loaded = time.perf_counter()
+
+    columns = {args.id_column: frame[args.id_column].to_numpy()}
+    columns.update(score_corpus_column(frame[args.text_column]))
+    if args.names:
+        columns["name"] = name_corpus_column(frame[args.text_column], args.name_processes)
+    scored = time.perf_counter()
+
+    write_columns(columns, output)
+    logger.info(
+        f"Scored {len(frame)} resumes in {scored - loaded:.2f}s "
+        f"(load {loaded - started:.2f}s, write {time.perf_counter() - scored:.2f}s) -> {output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Column-oriented, dictionary-encoded storage for the resume corpus.
+
+A store is a directory with one set of files per column:
+- string columns: <column>.codes.npy (integer codes, -1 for missing values)
+  plus <column>.dict.bin / <column>.dict_offsets.npy (the distinct values as
+  UTF-8, each stored once)
+- numeric columns: <column>.npy
+and a meta.json describing them. Every array is memory-mapped, so loading a
+column only touches that column's files, and repeated values such as job
+titles in `name` cost two bytes per row instead of a Python string each.
+
+Convert a CSV once:
+    python -m backend.corpus_store resume_dataset/01_people.csv -o resume_dataset/people.store
+
+Pass the store directory (or a .parquet file written with --format parquet)
+anywhere the bulk tools accept a corpus.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Parquet output is optional - the NumPy layout needs nothing beyond NumPy
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CORPUS_STORE_VERSION = 1
+# CSV rows parsed per chunk while converting; bounds memory for large corpora
+INGEST_CHUNK_ROWS = 100_000
+
+
+class DictionaryColumn:
+    """A dictionary-encoded string column: per-row codes into a table of distinct values"""
+
+    def __init__(self, codes: np.ndarray, values: List[str]):
+        self.codes = codes
+        self.values = values
+
+    def __len__(self):
+        return len(self.codes)
+
+    def decode(self) -> np.ndarray:
+        """Materialize the column as an object array of strings (None for missing values)"""
+        table = np.array(self.values + [None], dtype=object)
+        return table[self.codes]  # code -1 selects the trailing None
+
+    def to_categorical(self):
+        """A pandas Categorical that shares the codes instead of copying strings"""
+        import pandas as pd
+        return pd.Categorical.from_codes(np.asarray(self.codes), categories=self.values)
+
+
+class _ColumnEncoder:
+    """Builds one column chunk by chunk while the CSV is read"""
+
+    def __init__(self, name: str, numeric: bool):
+        self.name = name
+        self.numeric = numeric
+        self.chunks: List[np.ndarray] = []
+        self.lookup: Dict[str, int] = {}
+
+    def add(self, values):
+        if self.numeric:
+            self.chunks.append(values.to_numpy())
+            return
+        codes = np.empty(len(values), dtype=np.int32)
+        lookup = self.lookup
+        for i, value in enumerate(values.tolist()):
+            if value is None or value != value:  # NaN marks a missing value
+                codes[i] = -1
+            else:
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                codes[i] = code
+        self.chunks.append(codes)
+
+    def write(self, output_dir: str) -> dict:
+        values = np.concatenate(self.chunks) if self.chunks else np.empty(0)
+        if self.numeric:
+            np.save(os.path.join(output_dir, f"{self.name}.npy"), values)
+            return {"name": self.name, "kind": "numeric", "dtype": str(values.dtype)}
+
+        code_dtype = np.int16 if len(self.lookup) < np.iinfo(np.int16).max else np.int32
+        np.save(os.path.join(output_dir, f"{self.name}.codes.npy"), values.astype(code_dtype))
+        encoded = [value.encode("utf-8") for value in self.lookup]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        with open(os.path.join(output_dir, f"{self.name}.dict.bin"), "wb") as f:
+            f.write(b"".join(encoded))
+        np.save(os.path.join(output_dir, f"{self.name}.dict_offsets.npy"), offsets)
+        return {"name": self.name, "kind": "dictionary", "distinct": len(self.lookup)}
+
+
+def ingest_csv(csv_path: str, output_dir: str, columns: Optional[List[str]] = None,
+               chunk_rows: int = INGEST_CHUNK_ROWS) -> dict:
+    """
+    Convert a CSV corpus into a store directory.
+
+    Integer and float columns (as inferred from the first chunk) are stored as
+    plain arrays; every other column is dictionary-encoded.
+
+    Returns:
+        dict: The store metadata
+    """
+    import pandas as pd
+
+    encoders: Dict[str, _ColumnEncoder] = {}
+    rows = 0
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunk_rows):
+        if not encoders:
+            encoders = {
+                name: _ColumnEncoder(name, pd.api.types.is_numeric_dtype(chunk[name]))
+                for name in chunk.columns
+            }
+        for name, encoder in encoders.items():
+            encoder.add(chunk[name])
+        rows += len(chunk)
+
+    os.makedirs(output_dir, exist_ok=True)
+    meta = {
+        "version": CORPUS_STORE_VERSION,
+        "rows": rows,
+        "columns": [encoder.write(output_dir) for encoder in encoders.values()],
+        "source": os.path.basename(csv_path),
+        "built_at": time.time()
+    }
+    with open(os.path.join(output_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return meta
+
+
+def write_parquet(csv_path: str, output_path: str, columns: Optional[List[str]] = None):
+    """Convert a CSV corpus to Parquet with dictionary-encoded string columns"""
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Writing Parquet requires pyarrow; install it or use the NumPy store format")
+    import pandas as pd
+
+    frame = pd.read_csv(csv_path, usecols=columns)
+    for name in frame.columns:
+        if not pd.api.types.is_numeric_dtype(frame[name]):
+            frame[name] = frame[name].astype("category")
+    frame.to_parquet(output_path, index=False)
+
+
+class CorpusStore:
+    """Read access to a store directory written by ingest_csv"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != CORPUS_STORE_VERSION:
+            raise ValueError(f"Corpus store in {path} has an unsupported version; convert it again")
+        self.path = path
+        self.rows: int = self.meta["rows"]
+        self._columns = {column["name"]: column for column in self.meta["columns"]}
+        self._loaded: Dict[str, object] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str):
+        """
+        Load one column: a memory-mapped array for numeric columns, a
+        DictionaryColumn for string columns. Other columns are not read.
+        """
+        if name not in self._loaded:
+            info = self._columns.get(name)
+            if info is None:
+                raise KeyError(f"Unknown column: {name}")
+            if info["kind"] == "numeric":
+                self._loaded[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+            else:
+                self._loaded[name] = DictionaryColumn(
+                    np.load(os.path.join(self.path, f"{name}.codes.npy"), mmap_mode="r"),
+                    self._read_dictionary(name)
+                )
+        return self._loaded[name]
+
+    def _read_dictionary(self, name: str) -> List[str]:
+        offsets = np.load(os.path.join(self.path, f"{name}.dict_offsets.npy"))
+        with open(os.path.join(self.path, f"{name}.dict.bin"), "rb") as f:
+            data = f.read()
+        return [data[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def to_pandas(self, columns: Optional[Iterable[str]] = None):
+        """DataFrame of the given columns; string columns become Categoricals"""
+        import pandas as pd
+        data = {}
+        for name in columns or self.columns:
+            column = self.column(name)
+            data[name] = column.to_categorical() if isinstance(column, DictionaryColumn) else np.asarray(column)
+        return pd.DataFrame(data)
+
+
+def read_corpus(path: str, columns: List[str]):
+    """
+    Load columns of a corpus as a DataFrame, whatever format it is stored in:
+    a store directory, a Parquet file or a CSV file.
+
+    String columns of stores and Parquet files come back as Categoricals.
+    """
+    import pandas as pd
+
+    if os.path.isdir(path):
+        return CorpusStore(path).to_pandas(columns)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a CSV corpus into the columnar corpus store")
+    parser.add_argument("input", help="CSV file, e.g. resume_dataset/01_people.csv")
+    parser.add_argument("-o", "--output", required=True, help="Store directory, or .parquet file with --format parquet")
+    parser.add_argument("--format", choices=("numpy", "parquet"), default="numpy")
+    parser.add_argument("--columns", nargs="*", default=None, help="Columns to keep (default: all)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.format == "parquet":
+        write_parquet(args.input, args.output, args.columns)
+        logger.info(f"Wrote {args.output} in {time.perf_counter() - started:.2f}s")
+    else:
+        meta = ingest_csv(args.input, args.output, args.columns)
+        logger.info(f"Stored {meta['rows']} rows x {len(meta['columns'])} columns in "
+                    f"{time.perf_counter() - started:.2f}s -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import re
+from functools import cached_property
+from typing import Dict, List, Set, Union
+
+# Patterns shared by the parser, the scorers and the suggesters
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'\+?\d[\d\-\s]{8,}\d')
+BULLET_PATTERN = re.compile(r'[•\-\*]\s*(.*?)(?:\n|$)')
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class ResumeDocument:
+    """
+    Analysis view over the text of one uploaded resume.
+
+    Built once per upload and handed to every parser, scorer and suggester so the
+    lowercased text, tokens and regex matches are computed at most once. Every
+    attribute is computed lazily on first access and cached on the instance.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @classmethod
+    def of(cls, value: Union[str, "ResumeDocument"]) -> "ResumeDocument":
+        """Wrap raw text in a ResumeDocument, passing existing documents through"""
+        return value if isinstance(value, cls) else cls(value)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Whitespace separated tokens, as produced by str.split()"""
+        return self.text.split()
+
+    @property
+    def word_count(self) -> int:
+        return len(self.tokens)
+
+    @cached_property
+    def words(self) -> Set[str]:
+        """Distinct lowercase \\w+ runs, for whole-word lookups"""
+        return set(WORD_PATTERN.findall(self.lower))
+
+    @cached_property
+    def bullets(self) -> List[str]:
+        """Text of each bullet point (•, - or *)"""
+        return BULLET_PATTERN.findall(self.text)
+
+    @cached_property
+    def email(self) -> str:
+        match = EMAIL_PATTERN.search(self.text)
+        return match.group(0) if match else ""
+
+    @cached_property
+    def phone(self) -> str:
+        match = PHONE_PATTERN.search(self.text)
+        return match.group(0) if match else ""
+
+    @cached_property
+    def has_linkedin(self) -> bool:
+        return 'linkedin' in self.lower
+
+    @cached_property
+    def skill_matches(self) -> Dict[str, Dict]:
+        """Skill -> {"count", "offsets"} for every known skill in the text"""
+        from backend.resume_parser import SKILL_MATCHER
+        return SKILL_MATCHER.find_all(self.lower, lowered=True)
+
+    def mentions(self, keyword: str) -> bool:
+        """Whether the keyword appears as a whole word (case-insensitive)"""
+        keyword = keyword.lower()
+        if keyword in self.skill_matches:
+            return True
+        return re.search(r'\b' + re.escape(keyword) + r'\b', self.lower) is not None
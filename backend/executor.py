@@ -0,0 +1,72 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from backend.metrics import Gauge, executor_tasks
+from backend.startup import available_cpus
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes for CPU-bound work (text extraction, OCR).
+# 0 disables the pool and runs that work on a thread instead.
+PROCESS_WORKERS = int(os.getenv("RESUMEIQ_PROCESS_WORKERS", available_cpus()))
+
+# Size of asyncio's default thread pool, which run_in_thread uses
+THREAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _queue_depth() -> dict:
+    """Submitted tasks waiting for a free worker, per executor"""
+    return {
+        ("process",): max(0, executor_tasks.value(executor="process") - PROCESS_WORKERS),
+        ("thread",): max(0, executor_tasks.value(executor="thread") - THREAD_WORKERS)
+    }
+
+
+executor_queue_depth = Gauge(
+    "resumeiq_executor_queue_depth", "Executor tasks waiting for a free worker", ("executor",), function=_queue_depth)
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared process pool, creating it on first use"""
+    global _process_pool
+    if PROCESS_WORKERS <= 0:
+        return None
+    if _process_pool is None:
+        logger.info(f"Starting process pool with {PROCESS_WORKERS} workers")
+        _process_pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+    return _process_pool
+
+
+async def run_in_process(func: Callable, *args, **kwargs):
+    """
+    Run a CPU-bound function in the process pool without blocking the event loop.
+
+    The function and its arguments must be picklable. Falls back to a thread
+    when the pool is disabled.
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return await run_in_thread(func, *args, **kwargs)
+    with executor_tasks.track(executor="process"):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+
+
+async def run_in_thread(func: Callable, *args, **kwargs):
+    """Run blocking I/O or light CPU work on the default thread pool"""
+    with executor_tasks.track(executor="thread"):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+def shutdown_executors():
+    """Stop the process pool; called when the application shuts down"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
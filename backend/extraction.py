@@ -0,0 +1,95 @@
+import io
+import logging
+from typing import Callable, Dict
+from backend.executor import run_in_process
+from backend.ocr import find_scanned_pages, ocr_image_bytes, ocr_pdf_pages
+from backend.pdf_extraction import PDF_MAX_PAGES, document_text, extract_page_range, extract_pdf_pages
+from backend.startup import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# File extension -> function turning the uploaded bytes into text
+EXTRACTORS: Dict[str, Callable[[bytes], str]] = {}
+
+
+def register_extractor(*extensions: str):
+    """
+    Register a text extractor for one or more file extensions.
+
+    Extractors receive the raw uploaded bytes and must not touch the filesystem.
+    They run in worker processes, so register them at import time of a module
+    the workers also import, and import heavy libraries inside the extractor.
+    """
+    def decorator(func: Callable[[bytes], str]) -> Callable[[bytes], str]:
+        for ext in extensions:
+            EXTRACTORS[ext.lower()] = func
+        return func
+    return decorator
+
+
+def is_supported(ext: str) -> bool:
+    return ext.lower() in EXTRACTORS
+
+
+@register_extractor("pdf")
+def extract_pdf(contents: bytes) -> str:
+    return document_text(extract_page_range(contents, 0, PDF_MAX_PAGES))
+
+
+@register_extractor("docx", "doc")
+def extract_docx(contents: bytes) -> str:
+    return lazy_import("docx2txt").process(io.BytesIO(contents))
+
+
+@register_extractor("txt")
+def extract_txt(contents: bytes) -> str:
+    # Normalize newlines the way reading the file in text mode used to
+    text = contents.decode("utf-8", errors="ignore")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+@register_extractor("png", "jpg", "jpeg")
+def extract_image(contents: bytes) -> str:
+    return ocr_image_bytes(contents)
+
+
+def extract_text(contents: bytes, ext: str) -> str:
+    """
+    Extract the text of an uploaded resume directly from memory.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Args:
+        contents (bytes): The raw uploaded file
+        ext (str): Lowercase file extension with a registered extractor
+
+    Returns:
+        str: The extracted text
+    """
+    extractor = EXTRACTORS.get(ext.lower())
+    if extractor is None:
+        raise ValueError(f"Unsupported file format: {ext}")
+    return extractor(contents)
+
+
+async def extract_document_text(contents: bytes, ext: str) -> str:
+    """
+    Extract the text of an upload in the process pool, falling back to OCR
+    for PDF pages without a text layer.
+
+    PDFs are extracted page-parallel within the page and character budget of
+    backend.pdf_extraction. Scanned pages are OCR'd in parallel (see
+    backend.ocr) and their text is put back in page order.
+    """
+    if ext.lower() != "pdf":
+        return await run_in_process(extract_text, contents, ext)
+
+    pages = await extract_pdf_pages(contents)
+    scanned = find_scanned_pages([page["text"] for page in pages])
+    if scanned:
+        ocr_texts = await ocr_pdf_pages(contents, [pages[index]["number"] for index in scanned])
+        for index in scanned:
+            text = ocr_texts.get(pages[index]["number"])
+            if text:
+                pages[index] = {**pages[index], "text": text, "blocks": [{"text": text, "region": "body"}]}
+    return document_text(pages)
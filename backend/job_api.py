@@ -1,9 +1,244 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
 import requests
+import httpx
 import logging
 import os
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from backend.executor import run_in_thread
+from backend.metrics import job_lookup_seconds
+from backend.resilience import CircuitBreaker, CircuitOpenError, call_sync, call_with_budget
 
 logger = logging.getLogger(__name__)
 
+JSEARCH_URL = os.getenv("JSEARCH_URL", "https://jsearch.p.rapidapi.com/search")
+# Timeout for a single JSearch call, and the overall budget for one upload's job lookups
+JOB_SEARCH_TIMEOUT = float(os.getenv("JOB_SEARCH_TIMEOUT", "10"))
+JOB_SEARCH_DEADLINE = float(os.getenv("JOB_SEARCH_DEADLINE", "6"))
+# Latency budget of one JSearch call, hedge included; under the deadline so slow calls trip the breaker
+JOB_SEARCH_BUDGET = float(os.getenv("JOB_SEARCH_BUDGET", "5"))
+# Send a second, hedged request when the first has not answered after this many seconds (0 disables)
+JOB_SEARCH_HEDGE_AFTER = float(os.getenv("JOB_SEARCH_HEDGE_AFTER", "0"))
+DEFAULT_COUNTRIES = ("in", "us")
+# JSearch calls per country for one upload's uncached skills; the quota an upload can use
+JOB_LIVE_QUERIES = int(os.getenv("JOB_LIVE_QUERIES", "1"))
+# Description characters kept per listing for relevance ranking
+JOB_DESCRIPTION_CHARS = 5000
+
+# Job results cache: entries are fresh for JOB_CACHE_TTL seconds and can be served
+# stale (while a refresh runs in the background) until JOB_CACHE_STALE_TTL.
+JOB_CACHE_TTL = float(os.getenv("JOB_CACHE_TTL", "3600"))
+JOB_CACHE_STALE_TTL = float(os.getenv("JOB_CACHE_STALE_TTL", "86400"))
+JOB_CACHE_SIZE = int(os.getenv("JOB_CACHE_SIZE", "512"))
+# Optional SQLite file so the cache survives restarts and is shared between workers
+JOB_CACHE_DB = os.getenv("JOB_CACHE_DB")
+# Database writes between trims of the table to JOB_CACHE_SIZE rows
+JOB_CACHE_PRUNE_EVERY = 50
+
+# Shared by the sync and async clients; while open, lookups fall back without calling JSearch
+jsearch_breaker = CircuitBreaker("jsearch")
+
+# Keep-alive session reused by the synchronous client
+_session = requests.Session()
+# Pooled async client, created lazily on the running event loop
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop = None
+
+class JobCache:
+    """
+    Bounded TTL/LRU cache of job listings keyed by (skill, country).
+
+    Entries live in an in-process LRU and, when a database path is given, in a
+    SQLite table that other workers read from and that outlives restarts.
+    """
+
+    def __init__(self, max_entries: int = JOB_CACHE_SIZE, ttl: float = JOB_CACHE_TTL,
+                 stale_ttl: float = JOB_CACHE_STALE_TTL, db_path: Optional[str] = JOB_CACHE_DB):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        self.stats_counters = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refreshes": 0}
+        self.db_path = db_path
+        self._connect()
+
+    def _connect(self):
+        if self.db_path:
+            try:
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=1)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS job_cache ("
+                    "skill TEXT, country TEXT, stored_at REAL, jobs TEXT, PRIMARY KEY (skill, country))"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Job cache database unavailable, using memory only: {str(e)}")
+                self._db = None
+
+    def reopen(self):
+        """Open a new connection in a forked worker; SQLite connections must not cross a fork"""
+        self._lock = threading.Lock()
+        self._connect()
+
+    @staticmethod
+    def _key(skill, country) -> Tuple[str, str]:
+        return skill.strip().lower(), country.lower()
+
+    def _load(self, key):
+        """Look the key up in memory, then in the database"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT stored_at, jobs FROM job_cache WHERE skill = ? AND country = ?", key
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Job cache read failed: {str(e)}")
+            return None
+        if row is None:
+            return None
+        entry = (row[0], json.loads(row[1]))
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats_counters["evictions"] += 1
+
+    def get(self, skill, country) -> Tuple[Optional[list], bool]:
+        """
+        Look up cached jobs.
+
+        Returns:
+            tuple: (jobs, stale). jobs is None on a miss; stale is True when the
+                   entry is past its TTL but still within the stale window.
+        """
+        key = self._key(skill, country)
+        with self._lock:
+            entry = self._load(key)
+            age = time.time() - entry[0] if entry else None
+            if entry is None or age > self.stale_ttl:
+                self.stats_counters["misses"] += 1
+                return None, False
+            if age > self.ttl:
+                self.stats_counters["stale_hits"] += 1
+                return entry[1], True
+            self.stats_counters["hits"] += 1
+            return entry[1], False
+
+    def has(self, skill, country) -> bool:
+        """Whether jobs are cached for the key, fresh or stale, without counting a lookup"""
+        key = self._key(skill, country)
+        with self._lock:
+            entry = self._load(key)
+            return entry is not None and time.time() - entry[0] <= self.stale_ttl
+
+    def set(self, skill, country, jobs: list, refresh: bool = False):
+        """Store jobs for the key; refresh marks a background re-fetch of a stale entry"""
+        key = self._key(skill, country)
+        entry = (time.time(), jobs)
+        with self._lock:
+            self._remember(key, entry)
+            if refresh:
+                self.stats_counters["refreshes"] += 1
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO job_cache (skill, country, stored_at, jobs) VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], entry[0], json.dumps(jobs))
+                )
+                # Keep the table bounded as well, dropping the oldest entries now and then
+                self._writes += 1
+                if self._writes % JOB_CACHE_PRUNE_EVERY == 0:
+                    self._db.execute(
+                        "DELETE FROM job_cache WHERE rowid NOT IN "
+                        "(SELECT rowid FROM job_cache ORDER BY stored_at DESC LIMIT ?)",
+                        (self.max_entries,)
+                    )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Job cache write failed: {str(e)}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM job_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Counters for monitoring, including the hit ratio"""
+        with self._lock:
+            counters = dict(self.stats_counters)
+            lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+            counters["size"] = len(self._entries)
+            counters["hit_ratio"] = round((counters["hits"] + counters["stale_hits"]) / lookups, 3) if lookups else 0.0
+            counters["persistent"] = self._db is not None
+            return counters
+
+job_cache = JobCache()
+# Background refreshes of stale entries, keyed by cache key so each runs once
+_refresh_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+
+def _build_request(skill, country):
+    """Query parameters and headers for a JSearch call"""
+    querystring = {
+        "query": f"{skill} developer",
+        "page": "1",
+        "num_pages": "1",
+        "country": country,
+        "remote_jobs_only": "false"
+    }
+    headers = {
+        "x-rapidapi-key": os.getenv("RAPIDAPI_KEY"),
+        "x-rapidapi-host": os.getenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    }
+    # Drop unset headers (e.g. no API key configured) rather than sending "None"
+    return querystring, {name: value for name, value in headers.items() if value is not None}
+
+def _format_jobs(jobs, country):
+    """Convert raw JSearch results into the job dictionaries used by the app"""
+    top_jobs = []
+    for job in jobs[:5]:
+        salary = job.get("job_min_salary")
+        if salary is not None:
+            try:
+                salary = f"₹{int(salary):,}" if country == "in" else f"${int(salary):,}"
+            except (ValueError, TypeError):
+                salary = "Not specified"
+        else:
+            salary = "Not specified"
+            
+        top_jobs.append({
+            "title": job.get("job_title", "Software Developer"),
+            "company": job.get("employer_name", "Tech Company"),
+            "location": f"{job.get('job_city', 'Remote')}, {job.get('job_country', 'India')}",
+            "salary": salary,
+            "experience": job.get("job_required_experience", "Not specified"),
+            "employment_type": job.get("job_employment_type", "Full-time"),
+            "apply_link": job.get("job_apply_link", "https://example.com/apply"),
+            "posted_at": job.get("job_posted_at_datetime_utc", "Recent"),
+            "description": (job.get("job_description") or "")[:200] + "...",  # Truncate description
+            "full_description": (job.get("job_description") or "")[:JOB_DESCRIPTION_CHARS]  # For relevance ranking
+        })
+    return top_jobs
+
 def get_real_jobs(skill, country="in"):
     """
     Get real job listings from the JSearch API
@@ -15,61 +250,205 @@ def get_real_jobs(skill, country="in"):
     Returns:
         list: A list of job dictionaries
     """
-    try:
-        url = "https://jsearch.p.rapidapi.com/search"
-        querystring = {
-            "query": f"{skill} developer",
-            "page": "1",
-            "num_pages": "1",
-            "country": country,
-            "remote_jobs_only": "false"
-        }
-        headers = {
-            "x-rapidapi-key": os.getenv("RAPIDAPI_KEY"),
-            "x-rapidapi-host": os.getenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
-        }
+    cached, stale = job_cache.get(skill, country)
+    if cached is not None and not stale:
+        return cached
 
-        response = requests.get(url, headers=headers, params=querystring, timeout=10)
-        
-        # Check if the request was successful
-        if response.status_code != 200:
-            logger.warning(f"API request failed with status code {response.status_code}")
-            return get_mock_jobs(skill, country)
-            
-        data = response.json()
-        jobs = data.get("data", [])
-
-        # Process the jobs
-        top_jobs = []
-        for job in jobs[:5]:
-            salary = job.get("job_min_salary")
-            if salary is not None:
-                try:
-                    salary = f"₹{int(salary):,}" if country == "in" else f"${int(salary):,}"
-                except (ValueError, TypeError):
-                    salary = "Not specified"
-            else:
-                salary = "Not specified"
-                
-            top_jobs.append({
-                "title": job.get("job_title", "Software Developer"),
-                "company": job.get("employer_name", "Tech Company"),
-                "location": f"{job.get('job_city', 'Remote')}, {job.get('job_country', 'India')}",
-                "salary": salary,
-                "experience": job.get("job_required_experience", "Not specified"),
-                "employment_type": job.get("job_employment_type", "Full-time"),
-                "apply_link": job.get("job_apply_link", "https://example.com/apply"),
-                "posted_at": job.get("job_posted_at_datetime_utc", "Recent"),
-                "description": job.get("job_description", "")[:200] + "..."  # Truncate description
-            })
+    try:
+        querystring, headers = _build_request(skill, country)
+        response = call_sync(jsearch_breaker, _get_checked, JSEARCH_URL, headers=headers,
+                             params=querystring, timeout=min(JOB_SEARCH_TIMEOUT, JOB_SEARCH_BUDGET))
+        top_jobs = _format_jobs(response.json().get("data", []), country)
         
         # Return mock data if no jobs were found
-        return top_jobs if top_jobs else get_mock_jobs(skill, country)
+        if not top_jobs:
+            return cached or get_mock_jobs(skill, country)
+        job_cache.set(skill, country, top_jobs)
+        return top_jobs
         
+    except CircuitOpenError as e:
+        logger.debug(str(e))
+        return cached or get_mock_jobs(skill, country)
     except Exception as e:
         logger.error(f"Error fetching jobs: {str(e)}")
-        # Fallback to mock data in case of any error
-        return get_mock_jobs(skill, country)
+        # Fallback to stale cached or mock data in case of any error
+        return cached or get_mock_jobs(skill, country)
+
+def _get_checked(url, **kwargs):
+    """GET with the sync session; a non-200 status raises so the breaker counts it"""
+    response = _session.get(url, **kwargs)
+    if response.status_code != 200:
+        raise RuntimeError(f"API request failed with status code {response.status_code}")
+    return response
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client for the running event loop"""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        # Connections belong to the loop that opened them, so a new loop gets a new pool
+        _async_client = httpx.AsyncClient(
+            timeout=JOB_SEARCH_TIMEOUT,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+        _async_client_loop = loop
+    return _async_client
+
+async def close_job_client():
+    """Close the shared async client; called when the application shuts down"""
+    global _async_client, _async_client_loop
+    for task in list(_refresh_tasks.values()):
+        task.cancel()
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+        _async_client_loop = None
+
+async def _fetch_live_jobs(skill, country) -> Optional[list]:
+    """
+    Call JSearch through the shared pool within the budget, hedging slow calls
+
+    Returns None when the call fails, finds nothing or is skipped because the
+    circuit breaker is open.
+    """
+    querystring, headers = _build_request(skill, country)
+
+    async def attempt():
+        response = await get_async_client().get(JSEARCH_URL, headers=headers, params=querystring)
+        if response.status_code != 200:
+            raise RuntimeError(f"API request failed with status code {response.status_code}")
+        return response
+
+    try:
+        response = await call_with_budget(jsearch_breaker, attempt, JOB_SEARCH_BUDGET, JOB_SEARCH_HEDGE_AFTER)
+        return _format_jobs(response.json().get("data", []), country) or None
+
+    except CircuitOpenError as e:
+        logger.debug(str(e))
+        return None
+    except asyncio.TimeoutError:
+        logger.warning(f"Job search for {country} exceeded its {JOB_SEARCH_BUDGET}s budget")
+        return None
+    except Exception as e:
+        logger.error(f"Error fetching jobs: {str(e)}")
+        return None
+
+async def _refresh_jobs(skill, country):
+    """Re-fetch a stale cache entry in the background"""
+    try:
+        jobs = await _fetch_live_jobs(skill, country)
+        if jobs:
+            await run_in_thread(job_cache.set, skill, country, jobs, refresh=True)
+    finally:
+        _refresh_tasks.pop(JobCache._key(skill, country), None)
+
+async def fetch_real_jobs(skill, country="in", live: bool = True):
+    """
+    Async variant of get_real_jobs using the job cache and the shared connection pool
+    
+    Fresh cache entries are returned without an outbound call. Stale entries are
+    returned immediately while a background task refreshes them.
+    
+    Args:
+        skill (str): The skill to search for jobs
+        country (str): Country code (default: "in" for India)
+        live (bool): Whether a cache miss may call JSearch; otherwise it returns no jobs
+        
+    Returns:
+        list: A list of job dictionaries, falling back to mock data on failure
+    """
+    start = time.perf_counter()
+    # With JOB_CACHE_DB set, lookups and writes hit SQLite, so they stay off the event loop
+    cached, stale = await run_in_thread(job_cache.get, skill, country)
+    if cached is not None:
+        key = JobCache._key(skill, country)
+        if stale and key not in _refresh_tasks:
+            _refresh_tasks[key] = asyncio.create_task(_refresh_jobs(skill, country))
+        job_lookup_seconds.observe(time.perf_counter() - start, source="stale_cache" if stale else "cache")
+        return cached
+    if not live:
+        job_lookup_seconds.observe(time.perf_counter() - start, source="skipped")
+        return []
+
+    jobs = await _fetch_live_jobs(skill, country)
+    if jobs:
+        await run_in_thread(job_cache.set, skill, country, jobs)
+        job_lookup_seconds.observe(time.perf_counter() - start, source="live")
+        return jobs
+    # Mock data is never cached so the next request tries the API again
+    job_lookup_seconds.observe(time.perf_counter() - start, source="mock")
+    return get_mock_jobs(skill, country)
+
+async def get_jobs_for_countries(skill, countries: Iterable[str] = DEFAULT_COUNTRIES,
+                                 deadline: float = JOB_SEARCH_DEADLINE,
+                                 live: Optional[Iterable[str]] = None) -> Dict[str, List[dict]]:
+    """
+    Fetch job listings for several countries concurrently within one deadline
+    
+    Args:
+        skill (str): The skill to search for jobs
+        countries (iterable): Country codes to search
+        deadline (float): Seconds to wait for all countries together
+        live (iterable): Countries whose cache misses may call JSearch (default: all)
+        
+    Returns:
+        dict: Country code -> list of job dictionaries. Countries that miss the
+              deadline get mock data without affecting the others.
+    """
+    live = set(countries if live is None else live)
+    tasks = {country: asyncio.create_task(fetch_real_jobs(skill, country, country in live)) for country in countries}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+    results = {}
+    for country, task in tasks.items():
+        if task.done():
+            results[country] = task.result()
+        else:
+            task.cancel()
+            logger.warning(f"Job search for {country} missed the {deadline}s deadline, using mock data")
+            job_lookup_seconds.observe(deadline, source="deadline_mock")
+            results[country] = get_mock_jobs(skill, country)
+    return results
+
+async def get_jobs_for_skills(skills: List[str], countries: Iterable[str] = DEFAULT_COUNTRIES,
+                              live_per_country: int = JOB_LIVE_QUERIES,
+                              deadline: float = JOB_SEARCH_DEADLINE) -> List[Dict[str, List[dict]]]:
+    """
+    Fetch job listings for several skills, most valuable first, within one deadline
+
+    Cached (skill, country) pairs cost no quota. Of the uncached ones, only the
+    first live_per_country skills per country call JSearch; the others get no
+    jobs this time and are searched by a later upload, once the skills ahead of
+    them are cached.
+
+    Args:
+        skills (list): Skills to search for, in order of preference
+        countries (iterable): Country codes to search
+        live_per_country (int): JSearch calls allowed per country
+        deadline (float): Seconds to wait for all searches together
+
+    Returns:
+        list: One country code -> job list dictionary per skill, in order
+    """
+    countries = tuple(countries)
+    cached = await run_in_thread(
+        lambda: {(skill, country) for skill in skills for country in countries if job_cache.has(skill, country)})
+    live: Dict[str, set] = {skill: set() for skill in skills}
+    for country in countries:
+        misses = [skill for skill in skills if (skill, country) not in cached]
+        for skill in misses[:live_per_country]:
+            live[skill].add(country)
+    return list(await asyncio.gather(*(
+        get_jobs_for_countries(skill, countries, deadline, live=live[skill]) for skill in skills
+    )))
+
+# Mock listings link here; analyses built on them are not cached
+MOCK_JOB_LINK = "https://example.com/jobs/"
+
+def is_mock_job(job: dict) -> bool:
+    """Whether a listing came from get_mock_jobs rather than the API"""
+    return job.get("apply_link", "").startswith(MOCK_JOB_LINK)
 
 def get_mock_jobs(skill, country="in"):
     """Provide mock job data when the API fails"""
@@ -96,7 +475,7 @@ def get_mock_jobs(skill, country="in"):
             "salary": f"{currency}{salary_ranges[country][0]} - {currency}{salary_ranges[country][1]} per year",
             "experience": "5-8 years",
             "employment_type": "Full-time",
-            "apply_link": "https://example.com/jobs/1",
+            "apply_link": f"{MOCK_JOB_LINK}1",
             "posted_at": "2 days ago",
             "description": f"Looking for an experienced {skill} developer with strong problem-solving skills..."
         },
@@ -107,7 +486,7 @@ def get_mock_jobs(skill, country="in"):
             "salary": f"{currency}{salary_ranges[country][1]} - {currency}{salary_ranges[country][2]} per year",
             "experience": "8-12 years",
             "employment_type": "Full-time",
-            "apply_link": "https://example.com/jobs/2",
+            "apply_link": f"{MOCK_JOB_LINK}2",
             "posted_at": "1 week ago",
             "description": f"Leading {skill} development team in building scalable applications..."
         },
@@ -118,7 +497,7 @@ def get_mock_jobs(skill, country="in"):
             "salary": f"{currency}{salary_ranges[country][0]} - {currency}{salary_ranges[country][1]} per year",
             "experience": "2-5 years",
             "employment_type": "Full-time",
-            "apply_link": "https://example.com/jobs/3",
+            "apply_link": f"{MOCK_JOB_LINK}3",
             "posted_at": "3 days ago",
             "description": f"Developing and maintaining {skill} applications..."
         },
@@ -129,7 +508,7 @@ def get_mock_jobs(skill, country="in"):
             "salary": f"{currency}{salary_ranges[country][2]} - {currency}{salary_ranges[country][3]} per year",
             "experience": "5-8 years",
             "employment_type": "Full-time",
-            "apply_link": "https://example.com/jobs/4",
+            "apply_link": f"{MOCK_JOB_LINK}4",
             "posted_at": "Just now",
             "description": f"Building next-generation {skill} solutions..."
         },
@@ -140,7 +519,7 @@ def get_mock_jobs(skill, country="in"):
             "salary": f"{currency}{salary_ranges[country][3]} - {currency}{salary_ranges[country][4]} per year",
             "experience": "10-15 years",
             "employment_type": "Full-time",
-            "apply_link": "https://example.com/jobs/5",
+            "apply_link": f"{MOCK_JOB_LINK}5",
             "posted_at": "4 days ago",
             "description": f"Architecting and leading {skill} projects..."
         }
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from backend.executor import PROCESS_WORKERS
+from backend.metrics import Gauge
+from backend.pipeline import STAGES, analyze_resume
+from backend.shared_state import shared_state
+
+logger = logging.getLogger(__name__)
+
+# Analyses processed at the same time by the queue workers
+ANALYSIS_QUEUE_WORKERS = int(os.getenv("RESUMEIQ_QUEUE_WORKERS", max(PROCESS_WORKERS, 1) * 2))
+# Accepted analyses waiting for a worker; further submissions are rejected until there is room
+ANALYSIS_QUEUE_SIZE = int(os.getenv("RESUMEIQ_QUEUE_SIZE", "100"))
+# How long finished jobs stay available at the status endpoint
+ANALYSIS_JOB_TTL = float(os.getenv("RESUMEIQ_JOB_TTL", "900"))
+
+
+class QueueFullError(Exception):
+    """Raised when the analysis queue has no room for another job"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Analysis queue is full")
+        self.retry_after = retry_after
+
+
+class AnalysisJob:
+    """One queued analysis and the partial results of its stages"""
+
+    def __init__(self, contents: bytes, filename: str):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.contents: Optional[bytes] = contents
+        self.status = "queued"
+        self.stages: Dict[str, Any] = {}
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.revision = 0
+
+    @classmethod
+    def from_record(cls, job_id: str, record: dict) -> "AnalysisJob":
+        """A job run by another server worker, as last recorded in the shared state"""
+        job = cls(None, record["filename"])
+        job.job_id = job_id
+        for field in ("status", "stages", "result", "error", "created_at", "started_at", "finished_at"):
+            setattr(job, field, record[field])
+        return job
+
+    def record(self) -> dict:
+        """What other server workers need to answer for this job (see backend.shared_state)"""
+        return {
+            "filename": self.filename, "status": self.status, "stages": dict(self.stages), "result": self.result,
+            "error": self.error, "created_at": self.created_at, "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+    def save_soon(self):
+        self.revision += 1
+        shared_state.save_soon("job", self.job_id, self.record(), self.revision)
+
+    async def save(self):
+        self.revision += 1
+        await shared_state.save("job", self.job_id, self.record(), self.revision)
+
+    def publish(self, stage: str, result: Any):
+        self.stages[stage] = result
+        self.save_soon()
+
+    def snapshot(self) -> dict:
+        """Everything known about the job so far"""
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "stages": {stage: self.stages[stage] for stage in STAGES if stage in self.stages},
+            "pending_stages": [stage for stage in STAGES if stage not in self.stages],
+            "result": self.result,
+            "error": self.error,
+            "queued_seconds": round((self.started_at or time.time()) - self.created_at, 3),
+            "elapsed_seconds": round((self.finished_at or time.time()) - (self.started_at or time.time()), 3)
+        }
+
+
+class AnalysisQueue:
+    """
+    In-process job queue for analyses.
+
+    Submitting returns at once with a job ID; a fixed number of workers run the
+    pipeline and each stage's result becomes visible as soon as it completes.
+    The waiting line is bounded, so bursts beyond it are rejected instead of
+    piling up in memory.
+    """
+
+    def __init__(self, workers: int = ANALYSIS_QUEUE_WORKERS, max_pending: int = ANALYSIS_QUEUE_SIZE,
+                 job_ttl: float = ANALYSIS_JOB_TTL):
+        self.workers = max(workers, 1)
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._durations: List[float] = []
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, contents: bytes, filename: str) -> AnalysisJob:
+        """Queue an analysis; raises QueueFullError when the queue is at capacity"""
+        if self._queue is None:
+            raise RuntimeError("Analysis queue has not been started")
+        self._prune()
+        job = AnalysisJob(contents, filename)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(self.retry_after())
+        self._jobs[job.job_id] = job
+        job.save_soon()
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    async def find(self, job_id: str) -> Optional[AnalysisJob]:
+        """A job of this worker's queue, or else as another server worker recorded it"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        record = await shared_state.load("job", job_id)
+        return AnalysisJob.from_record(job_id, record) if record is not None else None
+
+    def retry_after(self) -> int:
+        """Rough seconds until a queue slot frees up, from recent job durations"""
+        recent = self._durations[-20:]
+        average = sum(recent) / len(recent) if recent else 5.0
+        return max(1, int(average * self.depth / self.workers))
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self.depth,
+            "capacity": self.max_pending,
+            "running": sum(1 for job in self._jobs.values() if job.status == "running"),
+            "tracked_jobs": len(self._jobs)
+        }
+
+    def _prune(self):
+        """Forget finished jobs older than the TTL"""
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: AnalysisJob):
+        job.status = "running"
+        job.started_at = time.time()
+        job.save_soon()
+        contents, job.contents = job.contents, None  # Free the upload as soon as it is consumed
+        try:
+            result = await analyze_resume(contents, job.filename, publish=job.publish)
+            if "error" in result:
+                job.status, job.error = "failed", result["error"]
+            else:
+                job.status, job.result = "complete", result
+        except Exception as e:
+            logger.error(f"Analysis job {job.job_id} failed: {str(e)}")
+            job.status, job.error = "failed", f"Error processing resume: {str(e)}"
+        finally:
+            job.finished_at = time.time()
+            self._durations = self._durations[-99:] + [job.finished_at - job.started_at]
+            await job.save()
+
+
+analysis_queue = AnalysisQueue()
+
+analysis_queue_depth = Gauge(
+    "resumeiq_analysis_queue_depth", "Queued analyses waiting for a queue worker", function=lambda: analysis_queue.depth)
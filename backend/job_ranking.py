@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from backend.scoring import MARKET_SKILLS
+from backend.startup import lazy_import, timed
+
+logger = logging.getLogger(__name__)
+
+# Distinct job listings whose vectors are kept; older ones are vectorized again when seen
+JOB_RANKING_CACHE_SIZE = int(os.getenv("JOB_RANKING_CACHE_SIZE", "5000"))
+# Resume skills used as job search queries. Only cached skills are free: JOB_LIVE_QUERIES
+# (backend.job_api) caps the JSearch calls per country, so this does not multiply the quota used
+JOB_QUERY_SKILLS = int(os.getenv("JOB_QUERY_SKILLS", "3"))
+# Ranked jobs returned with an analysis
+JOB_RESULTS_LIMIT = int(os.getenv("JOB_RESULTS_LIMIT", "10"))
+
+# Hashed feature space; large enough that skill terms rarely collide
+N_FEATURES = 2 ** 18
+# Keeps skill names like c++, c#, node.js and ci/cd as single terms
+TOKEN_PATTERN = r"(?u)[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]"
+
+
+def top_skills(skills: List[str], limit: int = JOB_QUERY_SKILLS) -> List[str]:
+    """
+    The resume skills most worth searching jobs for: highest market weight first,
+    then vocabulary order for skills without a weight.
+    """
+    ranked = sorted(
+        enumerate(skills),
+        key=lambda item: (-MARKET_SKILLS.get(item[1].lower(), {}).get("weight", 0), item[0])
+    )
+    return [skill for _, skill in ranked[:limit]]
+
+
+def job_key(job: dict) -> Tuple[str, str, str]:
+    """Identity of a listing across searches, used for de-duplication and the vector cache"""
+    return job.get("title", ""), job.get("company", ""), job.get("apply_link", "")
+
+
+def job_text(job: dict) -> str:
+    return f"{job.get('title', '')}\n{job.get('full_description') or job.get('description', '')}"
+
+
+class JobRanker:
+    """
+    Ranks job listings by TF-IDF cosine similarity to a resume.
+
+    Terms are hashed, so vectorizing a listing needs no fitted vocabulary and
+    each new listing costs one transform. Document frequencies are updated
+    incrementally as listings are seen, so IDF weights improve as the job pool
+    grows without refitting. Listing vectors are cached by job_key.
+    """
+
+    def __init__(self, cache_size: int = JOB_RANKING_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._vectorizer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        # job_key -> (term indices, sublinear term frequencies) of the listing
+        self._vectors: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._doc_freq = None
+        self._doc_count = 0
+
+    def get_vectorizer(self):
+        """Create the vectorizer on first use; returns None when scikit-learn is not available"""
+        if self._loaded:
+            return self._vectorizer
+        with self._lock:
+            if not self._loaded:
+                try:
+                    text = lazy_import("sklearn.feature_extraction.text")
+                    with timed("job_ranking:vectorizer"):
+                        self._vectorizer = text.HashingVectorizer(
+                            n_features=N_FEATURES, alternate_sign=False, norm=None,
+                            token_pattern=TOKEN_PATTERN, ngram_range=(1, 2), stop_words="english"
+                        )
+                    self._doc_freq = lazy_import("numpy").zeros(N_FEATURES, dtype=lazy_import("numpy").int64)
+                except ImportError:
+                    logger.warning("scikit-learn not available, jobs will not be ranked")
+                    self._vectorizer = None
+                self._loaded = True
+        return self._vectorizer
+
+    def _transform(self, texts: List[str]):
+        """Hashed sublinear term frequencies, one CSR row per text"""
+        matrix = self._vectorizer.transform(texts).tocsr()
+        matrix.data = 1 + lazy_import("numpy").log(matrix.data)
+        return matrix
+
+    def _vectorize_new(self, jobs: Iterable[dict]):
+        """Vectorize listings not seen before and count their terms' document frequencies"""
+        np = lazy_import("numpy")
+        new = OrderedDict((job_key(job), job) for job in jobs if job_key(job) not in self._vectors)
+        if not new:
+            return
+        matrix = self._transform([job_text(job) for job in new.values()])
+        self._doc_freq += np.bincount(matrix.indices, minlength=N_FEATURES)
+        self._doc_count += len(new)
+        for row, key in enumerate(new):
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            self._vectors[key] = (matrix.indices[start:end], matrix.data[start:end])
+        while len(self._vectors) > self.cache_size:
+            _, (indices, _) = self._vectors.popitem(last=False)
+            self._doc_freq[indices] -= 1
+            self._doc_count -= 1
+
+    def _weigh(self, matrix):
+        """Apply IDF weights and L2-normalize rows"""
+        np = lazy_import("numpy")
+        preprocessing = lazy_import("sklearn.preprocessing")
+        idf = np.log((1 + self._doc_count) / (1 + self._doc_freq[matrix.indices])) + 1
+        matrix = matrix.copy()
+        matrix.data = matrix.data * idf
+        return preprocessing.normalize(matrix)
+
+    def rank(self, resume_text: str, jobs: List[dict]) -> Optional[List[Tuple[dict, float]]]:
+        """
+        Score listings against a resume.
+
+        Returns:
+            list: (job, cosine similarity) pairs, most relevant first, or None
+                  when scikit-learn is not available
+        """
+        if not jobs or self.get_vectorizer() is None:
+            return None if jobs else []
+        np = lazy_import("numpy")
+        sparse = lazy_import("scipy.sparse")
+        resume_vector = self._transform([resume_text])
+        with self._lock:
+            self._vectorize_new(jobs)
+            rows = []
+            for job in jobs:
+                key = job_key(job)
+                self._vectors.move_to_end(key)
+                rows.append(self._vectors[key])
+            indptr = np.concatenate(([0], np.cumsum([len(indices) for indices, _ in rows])))
+            job_matrix = sparse.csr_matrix(
+                (np.concatenate([data for _, data in rows]), np.concatenate([indices for indices, _ in rows]), indptr),
+                shape=(len(rows), N_FEATURES)
+            )
+            job_matrix = self._weigh(job_matrix)
+            resume_vector = self._weigh(resume_vector)
+        similarities = (job_matrix @ resume_vector.T).toarray().ravel()
+        order = np.argsort(-similarities, kind="stable")
+        return [(jobs[i], float(similarities[i])) for i in order]
+
+    def stats(self) -> dict:
+        return {"cached_vectors": len(self._vectors), "documents": self._doc_count}
+
+
+def rank_jobs(resume_text: str, jobs: List[dict], fallback_match: int,
+              limit: Optional[int] = JOB_RESULTS_LIMIT) -> List[dict]:
+    """
+    De-duplicate listings and order them by relevance to the resume.
+
+    Args:
+        resume_text (str): The extracted resume text
+        jobs (list): Listings from get_jobs_for_skills, possibly from several searches
+        fallback_match (int): Match value used for every job when ranking is unavailable
+        limit (int): Maximum number of jobs returned
+
+    Returns:
+        list: Copies of the listings with a "match" percentage, best match first
+    """
+    unique = list(OrderedDict((job_key(job), job) for job in jobs).values())
+    ranked = job_ranker.rank(resume_text, unique)
+    if ranked is None:
+        results = [{**job, "match": fallback_match} for job in unique]
+    else:
+        results = [{**job, "match": int(round(similarity * 100))} for job, similarity in ranked]
+    return results[:limit] if limit else results
+
+
+job_ranker = JobRanker()
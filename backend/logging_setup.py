@@ -0,0 +1,270 @@
+"""
+Logging for the server: records are queued by the code that logs them and
+formatted and written by a background thread, so a slow terminal or log
+collector never stalls the event loop.
+
+- The message of a record is only built by the writer thread; call sites pass
+  %-style arguments (logger.info("Extracted %d characters", n)) instead of
+  f-strings so nothing is formatted for records that are filtered out.
+- Records below WARNING are sampled per request with RESUMEIQ_LOG_SAMPLE_RATE:
+  a request keeps all of its verbose records or none, and warnings, errors and
+  request summaries are always written.
+- RequestLogMiddleware writes one summary record per request with its route,
+  status, duration and the time spent in each analysis stage.
+- RESUMEIQ_LOG_FORMAT=json writes one JSON object per line for log collectors.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+from backend.metrics import Counter
+
+LOG_LEVEL = os.getenv("RESUMEIQ_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("RESUMEIQ_LOG_FORMAT", "text").lower()
+# Share of requests whose DEBUG and INFO records are written
+LOG_SAMPLE_RATE = float(os.getenv("RESUMEIQ_LOG_SAMPLE_RATE", "1.0"))
+# Records waiting for the writer thread; further records are dropped, not waited for
+LOG_QUEUE_SIZE = int(os.getenv("RESUMEIQ_LOG_QUEUE_SIZE", "10000"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# uvicorn installs its own synchronous handlers; its records go through the queue instead
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+dropped_records = Counter(
+    "resumeiq_log_records_dropped_total", "Log records dropped because the log queue was full")
+
+# Per-request log context set by RequestLogMiddleware; copied into tasks and to_thread calls
+_request: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("resumeiq_request", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.handlers.QueueHandler] = None
+_output: Optional[logging.Handler] = None
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the record's `fields` merged in"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The usual text format, with the record's `fields` appended as key=value pairs"""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={_text_value(value)}" for key, value in fields.items())
+        return line
+
+
+def _text_value(value) -> str:
+    return json.dumps(value, separators=(",", ":")) if isinstance(value, (dict, list)) else str(value)
+
+
+class SamplingFilter(logging.Filter):
+    """Pass DEBUG and INFO records of sampled requests only; outside a request, sample per record"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1 or getattr(record, "fields", None):
+            return True
+        context = _request.get()
+        if context is not None:
+            return context["sampled"]
+        return random.random() < self.rate
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to the writer thread as they are.
+
+    The stock QueueHandler formats every message in the logging thread so the
+    record can be pickled; this queue never leaves the process, so formatting is
+    left to the writer. A full queue drops the record instead of blocking.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_records.inc()
+
+
+def configure_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT,
+                      sample_rate: float = LOG_SAMPLE_RATE, stream=None):
+    """
+    Route all logging through a bounded queue to a background writer thread.
+
+    Like logging.basicConfig, does nothing if the root logger already has
+    handlers, so scripts that set up their own logging keep it.
+
+    Args:
+        level (str): Root log level name
+        log_format (str): "text" or "json"
+        sample_rate (float): Share of requests whose DEBUG and INFO records are kept
+        stream: Where records are written (default: stderr)
+    """
+    global _listener, _handler, _output
+    with _configure_lock:
+        root = logging.getLogger()
+        if _listener is not None or root.handlers:
+            return
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter(TEXT_FORMAT))
+
+        records: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+        handler = _NonBlockingQueueHandler(records)
+        handler.addFilter(SamplingFilter(sample_rate))
+
+        root.addHandler(handler)
+        root.setLevel(level)
+        for name in SERVER_LOGGERS:
+            # Loggers without handlers are switched off (e.g. --no-access-log) and stay off
+            server_logger = logging.getLogger(name)
+            if server_logger.handlers:
+                server_logger.handlers.clear()
+                server_logger.propagate = True
+
+        _handler, _output = handler, output
+        _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(flush_logging)
+
+
+def _restart_after_fork():
+    """
+    A forked child (a preloaded server worker or a process pool worker) has the
+    queue but not the writer thread; give it its own queue and writer.
+    """
+    global _listener, _configure_lock
+    _configure_lock = threading.Lock()
+    if _listener is None:
+        return
+    records: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    _handler.queue = records
+    _listener = logging.handlers.QueueListener(records, _output, respect_handler_level=True)
+    _listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def flush_logging():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def record_stage(stage: str, seconds: float):
+    """Add time spent in a stage to the current request's summary; no-op outside a request"""
+    context = _request.get()
+    if context is not None:
+        stages = context["fields"]["stages"]
+        stages[stage] = round(stages.get(stage, 0) + seconds * 1000, 2)
+
+
+@contextmanager
+def request_stage(stage: str):
+    """Time the block as a stage of the current request's summary"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def sum_request_stages():
+    """
+    Report the current request's stage times as totals over its items, for
+    requests that analyze several files concurrently (batch uploads); their
+    sum can exceed the request's duration.
+    """
+    context = _request.get()
+    if context is not None:
+        context["summed"] = True
+
+
+def annotate_request(**fields):
+    """Add fields (file format, size, cache hits...) to the current request's summary"""
+    context = _request.get()
+    if context is not None:
+        context["fields"].update(fields)
+
+
+class RequestLogMiddleware:
+    """
+    ASGI middleware writing one summary record per HTTP request, replacing
+    per-request access logs. It also makes the per-request sampling decision.
+    """
+
+    def __init__(self, app, sample_rate: float = LOG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.logger = logging.getLogger("resumeiq.requests")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = uuid.uuid4().hex[:16]
+        fields = {"stages": {}}
+        context = {"sampled": self.sample_rate >= 1 or random.random() < self.sample_rate, "fields": fields}
+        token = _request.set(context)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                fields["status"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request.reset(token)
+            route = scope.get("route")
+            summary = {
+                "request_id": request_id,
+                "method": scope["method"],
+                "route": getattr(route, "path", None) or scope["path"],
+                "status": fields.pop("status", 500),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+            }
+            # Background work started by the request may still record stages; log a copy
+            summary.update((key, value) for key, value in fields.items() if key != "stages")
+            if fields["stages"]:
+                summary["stage_totals" if context.get("summed") else "stages"] = dict(fields["stages"])
+            self.logger.info("%s %s %s", scope["method"], scope["path"], summary["status"], extra={"fields": summary})
@@ -1,19 +1,74 @@
-from fastapi import FastAPI, File, UploadFile, Request, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-import os, tempfile, traceback, logging, fitz
-import docx2txt
-from PIL import Image
-import pytesseract
-
-# Setup logging
-logging.basicConfig(level=logging.DEBUG)
+import time
+_dotenv_start = time.perf_counter()
+# Load environment variables before any module reads its configuration (backend.startup
+# and backend.logging_setup read theirs on import)
+from dotenv import load_dotenv
+load_dotenv()
+
+from backend.startup import FAST_STARTUP, mark_ready, record, startup_report, timed, warm_up
+record("dotenv", "load", time.perf_counter() - _dotenv_start)
+with timed("fastapi", "import"):
+    from fastapi import FastAPI, File, UploadFile, Request, HTTPException
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
+    from fastapi.templating import Jinja2Templates
+    from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from typing import List
+import asyncio, json, os, logging
+
+# Setup logging - records are written by a background thread (see backend.logging_setup)
+from backend.logging_setup import RequestLogMiddleware, configure_logging, sum_request_stages
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Import dependencies - heavy libraries (spaCy, OpenAI, fitz, OCR) load lazily on first use
+with timed("backend.pipeline", "import"):
+    from backend.executor import run_in_process, run_in_thread, shutdown_executors
+    from backend.extraction import extract_text
+    from backend.job_api import close_job_client, job_cache
+    from backend.analysis_cache import analysis_cache
+    from backend.pipeline import analyze_resume
+    from backend.batch import analyze_batch, stream_ndjson, stream_sse, upload_items
+    from backend.suggestion_stream import cancel_streams, find_stream
+    from backend.job_queue import QueueFullError, analysis_queue
+    from backend.metrics import MetricsMiddleware, render as render_metrics
+    from backend.resilience import breaker_states
+    from backend.admission import AdmissionRejected, UploadGuardMiddleware, admission, rejected_uploads
+
+async def _warm_up_in_background():
+    """Load models and start the worker processes without delaying start-up"""
+    # Let lifespan start-up return first; the server only binds its port after that,
+    # and the warm-up itself runs on a thread so the loop keeps serving meanwhile
+    await asyncio.sleep(0)
+    try:
+        await asyncio.to_thread(warm_up)
+        with timed("process_pool", "warm_up"):
+            await run_in_process(extract_text, b"warm up", "txt")
+    except Exception as e:
+        logger.warning(f"Warm-up failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start-up and shut-down hooks for the application"""
+    await analysis_queue.start()
+    mark_ready()
+    warm_up_task = None
+    if not FAST_STARTUP:
+        warm_up_task = asyncio.create_task(_warm_up_in_background())
+    yield
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    await analysis_queue.stop()
+    await cancel_streams()
+    await close_job_client()
+    shutdown_executors()
+
 # Initialize FastAPI app
-app = FastAPI(title="ResumeIQ")
+app = FastAPI(title="ResumeIQ", lifespan=lifespan)
+
+# Size limits for uploads, enforced before their bodies are read
+app.add_middleware(UploadGuardMiddleware)
 
 # Enable CORS
 app.add_middleware(
@@ -22,6 +77,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestLogMiddleware)
 
 # Fixed path resolution
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,12 +89,6 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, "frontend", "templates")
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
 
-# Import dependencies
-from backend.scoring import score_resume, calculate_ats_score
-from backend.resume_parser import extract_resume_data
-from backend.job_api import get_real_jobs
-from backend.suggestions import suggest_improvements
-
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Serve the main upload page"""
@@ -83,158 +134,175 @@ async def results(request: Request):
     """Serve the results page"""
     return templates.TemplateResponse("results.html", {"request": request})
 
+def _at_capacity(e: AdmissionRejected) -> JSONResponse:
+    """429 for an upload that found no free analysis slot"""
+    rejected_uploads.inc(reason="overloaded")
+    logger.debug("Shedding upload: %d analyses in flight", admission.in_flight)
+    return JSONResponse(
+        status_code=429,
+        content={"error": "The server is at capacity, please retry later"},
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+async def _releasing_slot(records):
+    """Pass the batch records through and free its analysis slot once the stream ends"""
+    start = time.perf_counter()
+    try:
+        async for item in records:
+            yield item
+    finally:
+        await admission.release(time.perf_counter() - start)
+
 @app.post("/upload_resume/")
-async def upload_resume(file: UploadFile = File(...)):
-    """Process uploaded resume and return analysis"""
-    logger.info(f"Received resume upload: {file.filename}")
-    tmp_path = None
-    text = ""
+async def upload_resume(file: UploadFile = File(...), wait_for_suggestions: bool = False):
+    """
+    Process uploaded resume and return analysis.
+
+    Scores, skills and jobs are returned right away; AI suggestions are generated in
+    the background and follow at /suggestions/{analysis_id}. Pass
+    wait_for_suggestions=true to get them in this response instead.
+
+    Files over RESUMEIQ_MAX_UPLOAD_BYTES are rejected with 413, and uploads beyond
+    the in-flight limit with 429 and Retry-After (see backend.admission).
+    """
+    logger.debug("Received resume upload: %s", file.filename)
 
     try:
-        logger.info("Reading file contents...")
         contents = await file.read()
-        logger.info(f"File size: {len(contents)} bytes")
-        if not contents:
-            logger.error("Uploaded file is empty")
-            return {"error": "The uploaded file is empty"}
-
-        ext = file.filename.split('.')[-1].lower()
-        logger.info(f"File extension: {ext}")
-
-        logger.info("Creating temporary file...")
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{ext}") as tmp:
-            tmp.write(contents)
-            tmp_path = tmp.name
-        logger.info(f"Temporary file created: {tmp_path}")
-
-        # Extract text based on file type
-        logger.info(f"Extracting text from {ext} file...")
-        if ext == "pdf":
-            try:
-                logger.info("Processing PDF with fitz...")
-                with fitz.open(tmp_path) as doc:
-                    text = "\n".join(page.get_text() for page in doc)
-                logger.info(f"PDF processed, extracted {len(text)} characters")
-            except Exception as e:
-                logger.error(f"Error processing PDF: {str(e)}")
-                raise
-        elif ext in ("docx", "doc"):
-            logger.info("Processing DOCX with docx2txt...")
-            text = docx2txt.process(tmp_path)
-            logger.info(f"DOCX processed, extracted {len(text)} characters")
-        elif ext == "txt":
-            logger.info("Reading TXT file...")
-            with open(tmp_path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
-            logger.info(f"TXT processed, extracted {len(text)} characters")
-        elif ext in ("png", "jpg", "jpeg"):
-            try:
-                logger.info("Processing image with OCR...")
-                image = Image.open(tmp_path)
-                text = pytesseract.image_to_string(image)
-                logger.info(f"Image processed, extracted {len(text)} characters")
-            except Exception as e:
-                logger.error(f"Error processing image: {str(e)}")
-                raise
-        else:
-            logger.error(f"Unsupported file format: {ext}")
-            return {"error": f"Unsupported file format: {ext}"}
-
-        if not text.strip():
-            logger.error("No text could be extracted from the file")
-            return {"error": "No text could be extracted from the file"}
-
-        logger.info("Extracting resume data...")
-        data = extract_resume_data(text)
-        logger.info(f"Extracted data: skills={len(data.get('skills', []))}")
-
-        logger.info("Calculating scores...")
-        score, missing_skills, skill_categories = score_resume(data["skills"])
-        ats_score_data = calculate_ats_score(text, data["skills"])
-        logger.info(f"Scores calculated: overall={score}, ats={ats_score_data['ats_score']}")
-
-        logger.info("Fetching job recommendations...")
-        first_skill = data["skills"][0] if data["skills"] else "developer"
-        indian_jobs = get_real_jobs(first_skill, country="in")
-        us_jobs = get_real_jobs(first_skill, country="us")
-        logger.info(f"Jobs fetched: {len(indian_jobs)} IN, {len(us_jobs)} US")
-
-        logger.info("Generating suggestions...")
-        improvement = suggest_improvements(text)
-        logger.info("Suggestions generated")
-
-        # Format suggestions properly
-        formatted_suggestions = []
-        if isinstance(improvement, dict) and "suggestions" in improvement:
-            if isinstance(improvement["suggestions"], dict):
-                for category, items in improvement["suggestions"].items():
-                    if isinstance(items, list):
-                        for item in items:
-                            formatted_suggestions.append({
-                                "category": category.replace("_", " ").title(),
-                                "text": item
-                            })
-                    else:
-                        formatted_suggestions.append({
-                            "category": category.replace("_", " ").title(),
-                            "text": items
-                        })
-            elif isinstance(improvement["suggestions"], list):
-                formatted_suggestions = improvement["suggestions"]
-            else:
-                formatted_suggestions = [{"category": "General", "text": str(improvement["suggestions"])}]
-        elif isinstance(improvement, list):
-            formatted_suggestions = improvement
-        else:
-            formatted_suggestions = [{"category": "General", "text": str(improvement)}]
-
-        logger.info("Preparing response data...")
-        response_data = {
-            "scores": {
-                "overall": score,
-                "ats": ats_score_data["ats_score"],
-                "content": int((score + ats_score_data["ats_score"]) / 2)
-            },
-            "skills": [
-                {"name": skill, "score": 85} for skill in data["skills"]
-            ],
-            "suggestions": formatted_suggestions,
-            "jobs": [
-                {
-                    "title": job["title"],
-                    "company": job["company"],
-                    "location": job["location"],
-                    "match": int((score + ats_score_data["ats_score"]) / 2),
-                    "url": job["apply_link"]
-                }
-                for job in indian_jobs + us_jobs
-            ]
-        }
-
-        logger.info("Upload processing completed successfully")
+        logger.debug("File size: %d bytes", len(contents))
+        # The slot is taken once the upload is in, so slow transfers do not hold one
+        async with admission.slot():
+            response_data = await analyze_resume(contents, file.filename, defer_suggestions=not wait_for_suggestions)
+        if "error" not in response_data:
+            logger.debug("Upload processing completed successfully")
         return response_data
 
+    except AdmissionRejected as e:
+        return _at_capacity(e)
     except Exception as e:
-        logger.error(f"Error processing resume: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error processing resume: %s", e)
         return {"error": f"Error processing resume: {str(e)}"}
 
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                import time
-                time.sleep(0.1)
-                os.unlink(tmp_path)
-                logger.info(f"Temporary file removed: {tmp_path}")
-            except Exception as e:
-                logger.warning(f"Failed to remove temporary file {tmp_path}: {str(e)}")
+@app.post("/batch_upload/")
+async def batch_upload(files: List[UploadFile] = File(...), format: str = "ndjson"):
+    """
+    Analyze many resumes (or ZIP archives of resumes) and stream one record per
+    resume as each finishes, as NDJSON or, with format=sse, server-sent events.
+
+    The batch holds one analysis slot while it streams; without a free one it is
+    rejected with 429 and Retry-After.
+    """
+    logger.info("Received batch upload with %d files", len(files))
+    try:
+        await admission.acquire()
+    except AdmissionRejected as e:
+        return _at_capacity(e)
+    # Items are analyzed concurrently; their stage times add up to more than the request took
+    sum_request_stages()
+    try:
+        # Opening archives reads their directories from the spooled upload files
+        items = await run_in_thread(upload_items, files)
+    except BaseException:
+        await admission.release(0.0)
+        raise
+    records = _releasing_slot(analyze_batch(items))
+    if format == "sse":
+        return StreamingResponse(stream_sse(records), media_type="text/event-stream")
+    return StreamingResponse(stream_ndjson(records), media_type="application/x-ndjson")
+
+@app.post("/analyses/", status_code=202)
+async def submit_analysis(file: UploadFile = File(...)):
+    """
+    Queue a resume for analysis and return its job ID immediately.
+
+    Poll GET /analyses/{job_id} for the stages completed so far. When the queue
+    is full the upload is rejected with 503 and a Retry-After header.
+    """
+    contents = await file.read()
+    try:
+        job = analysis_queue.submit(contents, file.filename)
+    except QueueFullError as e:
+        return JSONResponse(
+            status_code=503,
+            content={"error": "The analysis queue is full, please retry later"},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    logger.info("Queued analysis %s for %s", job.job_id, file.filename)
+    return {"job_id": job.job_id, "status": job.status, "status_url": f"/analyses/{job.job_id}"}
+
+@app.get("/analyses/{job_id}")
+async def analysis_status(job_id: str):
+    """Status of a queued analysis with the result of every completed stage"""
+    job = await analysis_queue.find(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job ID")
+    return job.snapshot()
+
+@app.get("/suggestions/{analysis_id}")
+async def suggestions_status(analysis_id: str, since: int = 0):
+    """Polling endpoint: suggestion tokens generated so far, and the final suggestions once done"""
+    stream = await find_stream(analysis_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired analysis ID")
+    return stream.snapshot(since)
+
+@app.get("/suggestions/{analysis_id}/stream")
+async def suggestions_events(analysis_id: str, since: int = 0):
+    """Server-sent events: a "token" event per generated token, then a "done" event with the suggestions"""
+    stream = await find_stream(analysis_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired analysis ID")
+
+    async def events():
+        async for event in stream.events(since):
+            yield f"event: {event.pop('type')}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/search")
+async def search_candidates(q: str, k: int = 20):
+    """
+    Search the resume corpus with a boolean skill query, e.g. "python AND aws AND NOT java".
+
+    Returns the number of matching resumes and the k with the highest skill score.
+    """
+    # Imported here so NumPy stays off the start-up path
+    from backend.skill_index import get_skill_index
+    index = get_skill_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="The skill index has not been built")
+    try:
+        return {"query": q, **index.search(q, max(1, min(k, 100)))}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "message": "ResumeIQ API is running"}
+    breakers = breaker_states()
+    # Degraded while an upstream service is being skipped; uploads still work on fallbacks
+    degraded = any(breaker["state"] != "closed" for breaker in breakers.values())
+    return {
+        "status": "degraded" if degraded else "ok",
+        "message": "ResumeIQ API is running",
+        "circuit_breakers": breakers,
+        "admission": admission.stats(),
+        "job_cache": job_cache.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "analysis_queue": analysis_queue.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: request, stage and job lookup latencies, upload sizes and queue depths"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/startup")
+async def startup_timings():
+    """Report import and model load times by module"""
+    return startup_report()
 
 @app.get("/welcome")
 async def welcome(request: Request):
     """Returns a welcome message and logs request metadata"""
-    logger.info(f"Request received: {request.method} {request.url.path}")
+    logger.info("Request received: %s %s", request.method, request.url.path)
     return {"message": "Welcome to the ResumeIQ API!"}
@@ -0,0 +1,219 @@
+"""
+Candidate name extraction.
+
+Most resumes start with the candidate's name followed by their contact
+details, so a cheap check of the header answers without a model when a
+"Name:" label or an e-mail, phone number or profile link next to a name-shaped
+line confirms it. Otherwise spaCy looks for the first PERSON entity, with a pipeline
+that loads just what its named entity recognizer needs: the tagger, parser,
+attribute ruler and lemmatizer are never loaded. extract_names handles many
+resumes at once through nlp.pipe, optionally across several processes.
+"""
+import logging
+import re
+import threading
+from typing import Iterable, List, Optional
+
+from backend.metrics import Counter
+from backend.startup import lazy_import, timed
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = "en_core_web_sm"
+# Components the named entity recognizer does not use; tok2vec stays as other models' NER listens to it
+EXCLUDED_COMPONENTS = ("tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer")
+# Only the start of a resume is searched for the name
+NAME_WINDOW = 1000
+# Non-empty lines of the header checked for a name
+HEADER_LINES = 3
+# Texts per nlp.pipe batch
+PIPE_BATCH_SIZE = 64
+
+# Lines that only label the document
+_TITLE_LINES = {"resume", "résumé", "curriculum vitae", "cv", "bio-data", "biodata"}
+# Words of section headings ("PERSONAL DETAILS", "Work History"); a line made only of them is a heading
+_HEADING_WORDS = {
+    "resume", "résumé", "curriculum", "vitae", "cv", "bio-data", "biodata", "personal", "details", "detail",
+    "information", "info", "profile", "summary", "objective", "about", "me", "contact", "history", "work",
+    "employment", "career", "professional", "experience", "education", "academic", "qualifications", "skills",
+    "technical", "key", "core", "competencies", "projects", "achievements", "certifications", "references",
+    "languages", "interests", "hobbies", "declaration", "overview", "background", "and", "&", "of",
+}
+# Headings that may precede the name; after any other the header is already into the resume's sections
+_PERSONAL_HEADING_WORDS = {"personal", "details", "information", "info", "contact", "bio-data", "biodata", "about"}
+# Words that make a header line a job title or a place rather than a name
+_NOT_NAME_WORDS = _HEADING_WORDS | {
+    "engineer", "engineering", "developer", "manager", "analyst", "designer", "consultant", "architect",
+    "scientist", "specialist", "administrator", "intern", "student", "senior", "junior", "lead", "software",
+    "data", "full", "stack", "web", "python", "java", "javascript", "react", "cloud", "devops", "university",
+    "college", "street", "road", "avenue", "city", "town", "county", "state", "province", "district", "new",
+    "san", "santa", "los", "las", "united", "states", "kingdom", "india", "usa", "uk", "corp", "inc", "ltd",
+    "llc", "company", "technologies", "solutions", "group",
+}
+# Lowercase particles allowed inside a name (Ludwig van Beethoven)
+_NAME_PARTICLES = {"van", "von", "de", "da", "del", "der", "di", "du", "la", "le", "bin", "binti", "al"}
+_NAME_WORD = re.compile(r"[A-Z][A-Za-z'\-]*\.?$")
+_NAME_LABEL = re.compile(r"name\s*[:\-]\s*(.+)", re.IGNORECASE)
+# Contact details often share the name's line: "Jane Doe | jane@example.com | +1 555 0100"
+_SEPARATOR = re.compile(r"\s+[|•·–—]\s+|\t|,")
+# An e-mail address or profile link; on or right after the name's line it confirms the name, as does a phone number
+_CONTACT = re.compile(r"[\w.+\-]+@[\w\-]+\.[\w.\-]+|linkedin\.com|github\.com|https?://", re.IGNORECASE)
+_PHONE = re.compile(r"\+?\d[\d\s().\-]{7,}\d")
+# Digits a phone number has at least, so year ranges ("2019 - 2023") do not pass for one
+_PHONE_DIGITS = 9
+
+name_extractions = Counter(
+    "resumeiq_name_extractions_total", "Candidate names found, by the method that found them", ("method",))
+
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+
+
+def get_name_nlp():
+    """Load the NER-only spaCy pipeline on first call; returns None when spaCy is not available"""
+    global _nlp, _nlp_loaded
+    if _nlp_loaded:
+        return _nlp
+    with _nlp_lock:
+        if not _nlp_loaded:
+            try:
+                spacy = lazy_import("spacy")
+                with timed(f"spacy:{SPACY_MODEL}:ner"):
+                    _nlp = spacy.load(SPACY_MODEL, exclude=list(EXCLUDED_COMPONENTS))
+            except (ImportError, OSError):
+                logger.warning("spaCy not available, using basic extraction methods")
+                _nlp = None
+            _nlp_loaded = True
+    return _nlp
+
+
+def _looks_like_name(line: str) -> bool:
+    words = line.split()
+    if not 2 <= len(words) <= 4 or not _NAME_WORD.match(words[0]) or not _NAME_WORD.match(words[-1]):
+        return False
+    for word in words:
+        if word.lower().rstrip(".") in _NOT_NAME_WORDS:
+            return False
+        if not _NAME_WORD.match(word) and word not in _NAME_PARTICLES:
+            return False
+    return True
+
+
+def _has_contact(text: str) -> bool:
+    if _CONTACT.search(text):
+        return True
+    return any(sum(c.isdigit() for c in match) >= _PHONE_DIGITS for match in _PHONE.findall(text))
+
+
+def _heading_words(line: str) -> Optional[set]:
+    """The words of a section heading line, or None when the line is not one"""
+    words = set(line.rstrip(":").lower().split())
+    return words if words and words <= _HEADING_WORDS else None
+
+
+def name_from_header(text: str) -> Optional[str]:
+    """
+    The name at the top of the resume, when the header confirms it.
+
+    Document titles and personal-details headings ("PERSONAL DETAILS") are
+    skipped; the first other line decides. It counts as the name when a
+    "Name: ..." label introduces it, or when it is name-shaped and contact
+    details follow on the same or the next line. A name-shaped line alone
+    ("Sales Executive", "Mumbai Maharashtra") is left to the model, as is any
+    other section heading ("Work History").
+
+    Returns:
+        str: The name, or None when the header is not confidently a name (the
+             model should decide)
+    """
+    lines = [line.strip() for line in text[:NAME_WINDOW].split("\n") if line.strip()]
+    for i, line in enumerate(lines[:HEADER_LINES]):
+        label = _NAME_LABEL.match(line)
+        if label:
+            candidate = _SEPARATOR.split(label.group(1).strip(), 1)[0].strip()
+            return candidate if _looks_like_name(candidate) else None
+        if line.lower().rstrip(":") in _TITLE_LINES:
+            continue
+        heading = _heading_words(line)
+        if heading is not None:
+            if heading & _PERSONAL_HEADING_WORDS:
+                continue
+            return None
+        parts = _SEPARATOR.split(line, 1)
+        candidate = parts[0].strip()
+        if not _looks_like_name(candidate):
+            return None
+        rest = parts[1] if len(parts) > 1 else ""
+        next_line = lines[i + 1] if i + 1 < len(lines) else ""
+        return candidate if _has_contact(rest) or _has_contact(next_line) else None
+    return None
+
+
+def _first_person(spacy_doc) -> str:
+    for ent in spacy_doc.ents:
+        if ent.label_ == "PERSON":
+            return ent.text
+    return ""
+
+
+def _first_line(text: str) -> str:
+    lines = text.strip().split("\n")
+    return lines[0].strip() if lines else ""
+
+
+def extract_name(text: str) -> str:
+    """
+    Find the candidate's name.
+
+    Args:
+        text (str): The resume text
+
+    Returns:
+        str: The name from the header, else the first PERSON entity spaCy finds,
+             else the first line of the text
+    """
+    name = name_from_header(text)
+    if name:
+        name_extractions.inc(method="header")
+        return name
+    nlp = get_name_nlp()
+    if nlp is not None:
+        name = _first_person(nlp(text[:NAME_WINDOW]))
+        if name:
+            name_extractions.inc(method="model")
+            return name
+    name_extractions.inc(method="first_line")
+    return _first_line(text)
+
+
+def extract_names(texts: Iterable[str], n_process: int = 1, batch_size: int = PIPE_BATCH_SIZE) -> List[str]:
+    """
+    Find the names of many resumes, with the same result as extract_name per text.
+
+    Args:
+        texts (iterable): Resume texts
+        n_process (int): Processes spaCy spreads the texts without a confident header over
+        batch_size (int): Texts per nlp.pipe batch
+
+    Returns:
+        list: One name per text, in order
+    """
+    texts = list(texts)
+    names: List[Optional[str]] = [name_from_header(text) for text in texts]
+    pending = [i for i, name in enumerate(names) if name is None]
+    name_extractions.inc(len(texts) - len(pending), method="header")
+
+    nlp = get_name_nlp() if pending else None
+    if nlp is not None:
+        heads = (texts[i][:NAME_WINDOW] for i in pending)
+        for i, spacy_doc in zip(pending, nlp.pipe(heads, batch_size=batch_size, n_process=n_process)):
+            names[i] = _first_person(spacy_doc) or None
+        found = sum(1 for i in pending if names[i])
+        name_extractions.inc(found, method="model")
+        pending = [i for i in pending if not names[i]]
+
+    name_extractions.inc(len(pending), method="first_line")
+    for i in pending:
+        names[i] = _first_line(texts[i])
+    return names
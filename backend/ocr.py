@@ -0,0 +1,184 @@
+import asyncio
+import io
+import logging
+import os
+from typing import Dict, List
+
+from backend.executor import run_in_process
+from backend.startup import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Resolution images are normalized to and scanned PDF pages are rendered at
+OCR_TARGET_DPI = int(os.getenv("RESUMEIQ_OCR_DPI", "300"))
+# Scanned PDF pages OCR'd per upload; later pages are skipped
+OCR_MAX_PAGES = int(os.getenv("RESUMEIQ_OCR_MAX_PAGES", "10"))
+# Seconds tesseract may spend on one page before it is stopped
+OCR_PAGE_TIMEOUT = float(os.getenv("RESUMEIQ_OCR_PAGE_TIMEOUT", "30"))
+# PDF pages whose text layer has fewer characters than this are treated as scanned
+OCR_MIN_PAGE_CHARS = int(os.getenv("RESUMEIQ_OCR_MIN_PAGE_CHARS", "20"))
+
+# Images without DPI information are assumed to be one page; the longer side is
+# limited to the height of an A4 page at the target resolution
+_PAGE_LONG_SIDE_INCHES = 11.7
+# Skew angles tried by deskew(), in degrees
+_SKEW_RANGE = 5.0
+_SKEW_STEP = 0.5
+# Side of the thumbnail the skew angle is estimated on
+_SKEW_SAMPLE_SIZE = 800
+
+
+def normalize_image(image, dpi: int = OCR_TARGET_DPI):
+    """
+    Prepare an image for OCR: apply EXIF rotation, convert to grayscale,
+    downscale to the target DPI and straighten small rotations.
+
+    Images are never upscaled.
+    """
+    ImageOps = lazy_import("PIL.ImageOps")
+    image = ImageOps.exif_transpose(image).convert("L")
+
+    source_dpi = image.info.get("dpi", (0, 0))[0]
+    if source_dpi and source_dpi > dpi:
+        scale = dpi / float(source_dpi)
+    else:
+        scale = min(1.0, (_PAGE_LONG_SIDE_INCHES * dpi) / max(image.size))
+    if scale < 1.0:
+        size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        image = image.resize(size, lazy_import("PIL.Image").LANCZOS)
+
+    return deskew(image)
+
+
+def estimate_skew(image) -> float:
+    """
+    Estimate the rotation of the text lines in a grayscale image, in degrees.
+
+    Text lines rotated into horizontal position give the sharpest row profile,
+    so the angle with the highest variance of dark pixels per row wins.
+    """
+    np = lazy_import("numpy")
+    sample = image.copy()
+    sample.thumbnail((_SKEW_SAMPLE_SIZE, _SKEW_SAMPLE_SIZE))
+    ink = sample.point(lambda value: 255 if value < 128 else 0)
+
+    best_angle, best_score = 0.0, -1.0
+    steps = int(_SKEW_RANGE / _SKEW_STEP)
+    for step in range(-steps, steps + 1):
+        angle = step * _SKEW_STEP
+        rows = np.asarray(ink.rotate(angle, fillcolor=0), dtype=np.float32).sum(axis=1)
+        score = float(np.var(rows))
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def deskew(image):
+    """Rotate a grayscale image so its text lines are horizontal"""
+    angle = estimate_skew(image)
+    if angle == 0.0:
+        return image
+    logger.debug("Deskewing image by %s degrees", angle)
+    return image.rotate(angle, expand=True, fillcolor=255, resample=lazy_import("PIL.Image").BICUBIC)
+
+
+def ocr_image(image, timeout: float = OCR_PAGE_TIMEOUT) -> str:
+    """
+    OCR a normalized image.
+
+    tesseract is killed once `timeout` passes, so a slow page frees its worker
+    process instead of occupying it after the caller gave up.
+
+    Returns:
+        str: The recognized text, or an empty string when tesseract times out
+
+    Raises:
+        RuntimeError: tesseract is missing or failed on the image
+    """
+    pytesseract = lazy_import("pytesseract")
+    try:
+        return pytesseract.image_to_string(image, timeout=timeout)
+    # Re-raised as plain errors: pytesseract's exceptions cannot be unpickled
+    # in the parent process, which would break the whole process pool
+    except pytesseract.TesseractNotFoundError:
+        raise RuntimeError("Tesseract is not installed or not on PATH")
+    except pytesseract.TesseractError as e:
+        raise RuntimeError(f"Tesseract failed with status {e.status}: {e.message}")
+    except RuntimeError as e:
+        # pytesseract kills tesseract and raises a bare RuntimeError once the timeout passes
+        if "timeout" not in str(e).lower():
+            raise
+        logger.warning("OCR stopped after %ss", timeout)
+        return ""
+
+
+def ocr_image_bytes(contents: bytes) -> str:
+    """Normalize and OCR an uploaded image"""
+    Image = lazy_import("PIL.Image")
+    with Image.open(io.BytesIO(contents)) as image:
+        return ocr_image(normalize_image(image))
+
+
+def ocr_pdf_page(page_pdf: bytes, dpi: int = OCR_TARGET_DPI, timeout: float = OCR_PAGE_TIMEOUT) -> str:
+    """
+    Render a single-page PDF at the target DPI and OCR it.
+
+    Runs in a worker process; the page is passed as its own small PDF so
+    workers don't each receive the whole upload.
+    """
+    fitz = lazy_import("fitz")
+    Image = lazy_import("PIL.Image")
+    with fitz.open(stream=page_pdf, filetype="pdf") as doc:
+        pixmap = doc[0].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    return ocr_image(deskew(image), timeout)
+
+
+def split_pdf_pages(contents: bytes, page_numbers: List[int]) -> Dict[int, bytes]:
+    """Copy the given pages of a PDF into single-page PDFs"""
+    fitz = lazy_import("fitz")
+    pages = {}
+    with fitz.open(stream=contents, filetype="pdf") as doc:
+        for number in page_numbers:
+            with fitz.open() as single:
+                single.insert_pdf(doc, from_page=number, to_page=number)
+                pages[number] = single.tobytes()
+    return pages
+
+
+def find_scanned_pages(page_texts: List[str], min_chars: int = OCR_MIN_PAGE_CHARS) -> List[int]:
+    """Indices of pages whose text layer is missing or too short to be real text"""
+    return [number for number, text in enumerate(page_texts) if len(text.strip()) < min_chars]
+
+
+async def ocr_pdf_pages(contents: bytes, page_numbers: List[int],
+                        max_pages: int = OCR_MAX_PAGES, timeout: float = OCR_PAGE_TIMEOUT) -> Dict[int, str]:
+    """
+    OCR pages of a PDF in parallel across the process pool.
+
+    At most `max_pages` pages are processed. A page that exceeds its timeout or
+    fails contributes no text instead of failing the upload.
+
+    Returns:
+        dict: Page index -> recognized text for every page that was OCR'd
+    """
+    if len(page_numbers) > max_pages:
+        logger.warning(f"OCR limited to {max_pages} of {len(page_numbers)} scanned pages")
+        page_numbers = page_numbers[:max_pages]
+    if not page_numbers:
+        return {}
+
+    pages = await run_in_process(split_pdf_pages, contents, page_numbers)
+
+    async def ocr_page(number: int) -> str:
+        try:
+            # tesseract is killed inside the worker at the timeout, which frees the process;
+            # timing out here instead would leave it running on a page nobody waits for
+            return await run_in_process(ocr_pdf_page, pages[number], timeout=timeout)
+        except Exception as e:
+            logger.error(f"OCR of page {number + 1} failed: {str(e)}")
+        return ""
+
+    logger.info("Running OCR on %d scanned PDF pages", len(page_numbers))
+    texts = await asyncio.gather(*(ocr_page(number) for number in page_numbers))
+    return dict(zip(page_numbers, texts))
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import re
+from typing import List, Optional, Tuple
+
+from backend.executor import PROCESS_WORKERS, run_in_process, run_in_thread
+from backend.startup import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Pages read from one PDF; later pages are ignored
+PDF_MAX_PAGES = int(os.getenv("RESUMEIQ_PDF_MAX_PAGES", "30"))
+# Characters of text read from one PDF; extraction stops once they are reached
+PDF_MAX_CHARS = int(os.getenv("RESUMEIQ_PDF_MAX_CHARS", "200000"))
+# Pages one worker extracts per task; PDFs with fewer pages use a single worker
+PDF_PAGES_PER_TASK = int(os.getenv("RESUMEIQ_PDF_PAGES_PER_TASK", "8"))
+
+# Blocks within this fraction of the page height from the top or bottom edge
+# are classified as header or footer
+MARGIN_FRACTION = 0.08
+
+_DIGITS = re.compile(r"\d+")
+
+
+def _region(y0: float, y1: float, height: float) -> str:
+    if y1 <= height * MARGIN_FRACTION:
+        return "header"
+    if y0 >= height * (1 - MARGIN_FRACTION):
+        return "footer"
+    return "body"
+
+
+def extract_page_range(contents: bytes, start: int, stop: int, max_chars: int = PDF_MAX_CHARS,
+                       first_number: int = 0) -> List[dict]:
+    """
+    Extract the text blocks of pages [start, stop) of a PDF.
+
+    Runs in a worker process. Stops after the page on which the extracted text
+    reaches `max_chars`. Page numbers are reported offset by `first_number`, for
+    PDFs holding a range of a larger document (see split_pdf_ranges).
+
+    Returns:
+        list: One dict per page with its index, text and layout blocks. Each
+              block has its bounding box, text and region (header/body/footer).
+    """
+    fitz = lazy_import("fitz")
+    pages = []
+    chars = 0
+    with fitz.open(stream=contents, filetype="pdf") as doc:
+        for number in range(start, min(stop, doc.page_count)):
+            page = doc[number]
+            height = page.rect.height
+            blocks = [
+                {"bbox": (x0, y0, x1, y1), "text": text, "region": _region(y0, y1, height)}
+                for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks")
+                if block_type == 0
+            ]
+            # Joined text blocks are what page.get_text() returns
+            text = "".join(block["text"] for block in blocks)
+            pages.append({"number": first_number + number, "text": text, "blocks": blocks})
+            chars += len(text)
+            if chars >= max_chars:
+                break
+    return pages
+
+
+def split_pdf_ranges(contents: bytes, ranges: List[Tuple[int, int]]) -> List[bytes]:
+    """Copy page ranges [start, stop) of a PDF into separate PDFs, so each worker is sent only its pages"""
+    fitz = lazy_import("fitz")
+    parts = []
+    with fitz.open(stream=contents, filetype="pdf") as doc:
+        for start, stop in ranges:
+            with fitz.open() as part:
+                part.insert_pdf(doc, from_page=start, to_page=stop - 1)
+                parts.append(part.tobytes())
+    return parts
+
+
+def pdf_page_count(contents: bytes) -> int:
+    fitz = lazy_import("fitz")
+    with fitz.open(stream=contents, filetype="pdf") as doc:
+        return doc.page_count
+
+
+async def extract_pdf_pages(contents: bytes, max_pages: int = PDF_MAX_PAGES,
+                            max_chars: int = PDF_MAX_CHARS) -> List[dict]:
+    """
+    Extract the pages of a PDF within a page and character budget.
+
+    Page ranges of PDF_PAGES_PER_TASK pages are extracted in parallel, one
+    wave of process-pool workers at a time, in page order. Each worker is sent
+    a small PDF of its own range rather than the whole upload. Once the pages
+    read so far hold `max_chars` characters no further ranges are started, so
+    the cost of an upload is bounded by the budget rather than its size.
+
+    Returns:
+        list: Pages as returned by extract_page_range, in order
+    """
+    page_count = min(await run_in_thread(pdf_page_count, contents), max_pages)
+    ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count))
+              for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+    wave_size = max(PROCESS_WORKERS, 1)
+
+    pages: List[dict] = []
+    chars = 0
+    for wave_start in range(0, len(ranges), wave_size):
+        wave = ranges[wave_start:wave_start + wave_size]
+        if len(ranges) == 1:
+            tasks = [(contents, 0, page_count, 0)]
+        else:
+            parts = await run_in_thread(split_pdf_ranges, contents, wave)
+            tasks = [(part, 0, stop - start, start) for part, (start, stop) in zip(parts, wave)]
+        results = await asyncio.gather(*(
+            run_in_process(extract_page_range, part, start, stop, max_chars - chars, first_number)
+            for part, start, stop, first_number in tasks
+        ))
+        for range_pages in results:
+            for page in range_pages:
+                if chars >= max_chars:
+                    break
+                pages.append(page)
+                chars += len(page["text"])
+        if chars >= max_chars:
+            skipped = page_count - len(pages)
+            if skipped:
+                logger.warning(f"PDF character budget of {max_chars} reached; skipped {skipped} pages")
+            break
+    return pages
+
+
+def _margin_key(text: str) -> str:
+    # Page numbers differ from page to page; compare margin text without digits
+    return _DIGITS.sub("#", " ".join(text.split())).lower()
+
+
+def page_body_text(page: dict, seen_margins: Optional[set] = None) -> str:
+    """
+    Text of a page without header and footer blocks already seen on earlier pages.
+
+    Pass the same `seen_margins` set for every page of a document, in order.
+    The first occurrence of a running header or footer is kept, so contact
+    details printed only in the header still reach the parser.
+    """
+    if seen_margins is None:
+        return page["text"]
+    parts = []
+    for block in page["blocks"]:
+        if block["region"] != "body":
+            key = _margin_key(block["text"])
+            if key in seen_margins:
+                continue
+            seen_margins.add(key)
+        parts.append(block["text"])
+    return "".join(parts)
+
+
+def document_text(pages: List[dict], skip_repeated_margins: bool = True) -> str:
+    """Join page texts, dropping running headers and footers after their first page"""
+    seen_margins = set() if skip_repeated_margins else None
+    return "\n".join(page_body_text(page, seen_margins) for page in pages)
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional
+
+from backend.analysis_cache import analysis_cache
+from backend.document import ResumeDocument
+from backend.executor import run_in_thread
+from backend.extraction import extract_document_text, is_supported
+from backend.job_api import get_jobs_for_skills, is_mock_job
+from backend.job_ranking import rank_jobs, top_skills
+from backend.logging_setup import annotate_request, request_stage
+from backend.metrics import extraction_seconds, stage_seconds, upload_bytes
+from backend.resume_parser import extract_resume_data
+from backend.scoring import score_resume, calculate_ats_score
+from backend.suggestion_stream import generate_suggestions, start_suggestion_stream
+
+logger = logging.getLogger(__name__)
+
+
+def analyze_document(doc: ResumeDocument) -> dict:
+    """
+    Parse and score an extracted resume.
+
+    Args:
+        doc (ResumeDocument): The shared analysis document for the upload
+
+    Returns:
+        dict: Extracted data, skill score, missing skills, skill categories and ATS score data
+    """
+    with stage_seconds.time(stage="parse"), request_stage("parse"):
+        data = extract_resume_data(doc)
+    with stage_seconds.time(stage="score"), request_stage("score"):
+        score, missing_skills, skill_categories = score_resume(data["skills"])
+        ats_score_data = calculate_ats_score(doc, data["skills"])
+    return {
+        "data": data,
+        "score": score,
+        "missing_skills": missing_skills,
+        "skill_categories": skill_categories,
+        "ats": ats_score_data
+    }
+
+
+# Stages of an analysis, in the order they usually complete
+STAGES = ("text", "parse", "scores", "jobs", "suggestions")
+
+# Called with a stage name and its result as soon as that stage finishes
+StagePublisher = Callable[[str, Any], None]
+
+
+async def analyze_resume(contents: bytes, filename: str, use_cache: bool = True,
+                         defer_suggestions: bool = False, publish: Optional[StagePublisher] = None) -> dict:
+    """
+    Run the full analysis for one uploaded resume without blocking the event loop.
+
+    Text extraction and OCR run in the process pool; parsing runs on a thread and the
+    job lookups and streaming suggestions call run concurrently on the loop. Results are
+    cached by the hash of the uploaded bytes, so re-uploading the same file
+    returns the stored analysis. Results built on mock jobs or fallback suggestions
+    are not cached, so a repeat upload tries the services again.
+
+    Args:
+        contents (bytes): The raw uploaded file
+        filename (str): Original file name, used to pick the extractor
+        use_cache (bool): Look up and store the result in the analysis cache
+        defer_suggestions (bool): Return without waiting for the AI suggestions. The response
+            then carries an analysis_id whose suggestions stream in the background
+            (see backend.suggestion_stream); it is cached once they complete.
+        publish (callable): Receives each of STAGES with its partial result as it completes
+
+    Returns:
+        dict: The analysis response, or {"error": ...} when the file cannot be analyzed
+    """
+    if not contents:
+        logger.error("Uploaded file is empty")
+        return {"error": "The uploaded file is empty"}
+
+    ext = filename.split('.')[-1].lower()
+    logger.debug("File extension: %s", ext)
+    if not is_supported(ext):
+        logger.error("Unsupported file format: %s", ext)
+        return {"error": f"Unsupported file format: {ext}"}
+    upload_bytes.observe(len(contents), format=ext)
+    annotate_request(format=ext, bytes=len(contents))
+
+    cache_key = analysis_cache.key_for(contents, filename) if use_cache else None
+    if cache_key:
+        # SQLite may wait on other workers' writes; keep that off the event loop
+        cached = await run_in_thread(analysis_cache.get, cache_key)
+        if cached is not None:
+            logger.debug("Returning cached analysis")
+            annotate_request(cached=True)
+            if publish is not None:
+                _publish_cached(cached, publish)
+            return cached
+
+    return await _run_analysis(contents, ext, cache_key, defer_suggestions, publish or _ignore_stage)
+
+
+def _ignore_stage(stage: str, result: Any):
+    pass
+
+
+def _publish_cached(response: dict, publish: StagePublisher):
+    """Replay the stages of a cached response; text and parse details are not stored"""
+    publish("text", {"cached": True})
+    publish("parse", {"cached": True, "skills": [skill["name"] for skill in response["skills"]]})
+    publish("scores", response["scores"])
+    publish("jobs", response["jobs"])
+    publish("suggestions", response["suggestions"])
+
+
+def format_jobs(jobs: List[dict]) -> List[dict]:
+    """Shape ranked job listings for the analysis response"""
+    return [
+        {
+            "title": job["title"],
+            "company": job["company"],
+            "location": job["location"],
+            "match": job["match"],
+            "url": job["apply_link"]
+        }
+        for job in jobs
+    ]
+
+
+async def _run_analysis(contents: bytes, ext: str, cache_key: Optional[str],
+                        defer_suggestions: bool, publish: StagePublisher) -> dict:
+    """Extract, parse, score and enrich one upload, caching the complete result"""
+    logger.debug("Extracting text from %s file...", ext)
+    with extraction_seconds.time(format=ext), request_stage("text"):
+        text = await extract_document_text(contents, ext)
+    logger.debug("Extracted %d characters", len(text))
+    publish("text", {"characters": len(text)})
+
+    if not text.strip():
+        logger.error("No text could be extracted from the file")
+        return {"error": "No text could be extracted from the file"}
+
+    # Shared analysis view - every stage below reads from it instead of rescanning the text
+    doc = ResumeDocument(text)
+
+    logger.debug("Extracting resume data and calculating scores...")
+    analysis = await run_in_thread(analyze_document, doc)
+    data = analysis["data"]
+    score = analysis["score"]
+    ats_score = analysis["ats"]["ats_score"]
+    logger.debug("Scores calculated: overall=%d, ats=%d, skills=%d", score, ats_score, len(data["skills"]))
+    scores = {
+        "overall": score,
+        "ats": ats_score,
+        "content": int((score + ats_score) / 2)
+    }
+    publish("parse", {key: value for key, value in data.items() if key != "skill_matches"})
+    publish("scores", {
+        **scores,
+        "missing_skills": analysis["missing_skills"],
+        "skill_categories": analysis["skill_categories"],
+        "ats_improvements": analysis["ats"]["improvements"]
+    })
+
+    logger.debug("Fetching job recommendations and generating suggestions...")
+    # Set when a service failed and its stand-in went into the response
+    fallbacks = set()
+    query_skills = top_skills(data["skills"]) or ["developer"]
+
+    async def fetch_jobs():
+        with stage_seconds.time(stage="jobs"), request_stage("jobs"):
+            searches = await get_jobs_for_skills(query_skills, ("in", "us"))
+            listings = [job for jobs_by_country in searches for country in ("in", "us") for job in jobs_by_country[country]]
+            logger.debug("Jobs fetched: %d for %s", len(listings), query_skills)
+            if any(is_mock_job(job) for job in listings):
+                fallbacks.add("jobs")
+            ranked = await run_in_thread(rank_jobs, doc.text, listings, scores["content"])
+            jobs = format_jobs(ranked)
+        publish("jobs", jobs)
+        return jobs
+
+    async def fetch_suggestions():
+        suggestions, source = await generate_suggestions(doc)
+        if source == "fallback":
+            fallbacks.add("suggestions")
+        publish("suggestions", suggestions)
+        return suggestions
+
+    if defer_suggestions:
+        jobs = await fetch_jobs()
+        suggestions = []
+    else:
+        jobs, suggestions = await asyncio.gather(fetch_jobs(), fetch_suggestions())
+
+    response_data = {
+        "scores": scores,
+        "skills": [
+            {"name": skill, "score": 85} for skill in data["skills"]
+        ],
+        "suggestions": suggestions,
+        "jobs": jobs
+    }
+
+    if not defer_suggestions:
+        if cache_key and not fallbacks:
+            await run_in_thread(analysis_cache.set, cache_key, response_data)
+        return response_data
+
+    async def complete_response(final_suggestions: list, source: str):
+        publish("suggestions", final_suggestions)
+        if cache_key and not fallbacks and source != "fallback":
+            await run_in_thread(analysis_cache.set, cache_key, {**response_data, "suggestions": final_suggestions})
+
+    stream = start_suggestion_stream(doc, on_complete=complete_response)
+    return {**response_data, "analysis_id": stream.analysis_id, "suggestions_status": stream.status}
@@ -0,0 +1,219 @@
+"""
+Circuit breakers, latency budgets and hedged calls for outbound services.
+
+Every call to an external API goes through its service's CircuitBreaker. After
+RESUMEIQ_CIRCUIT_FAILURES consecutive failures (errors, bad statuses or blown
+budgets) the breaker opens: calls are rejected at once with CircuitOpenError and
+the caller serves its fallback without waiting. Every RESUMEIQ_CIRCUIT_RESET_SECONDS
+one probe call is let through; its success closes the breaker again.
+
+call_with_budget bounds a call by a latency budget and can hedge it: when the
+first attempt has not answered after `hedge_after` seconds (or failed before
+that), a second attempt starts and the first successful answer wins.
+"""
+import asyncio
+import inspect
+import logging
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from backend.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_FAILURES = int(os.getenv("RESUMEIQ_CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("RESUMEIQ_CIRCUIT_RESET_SECONDS", "30"))
+
+T = TypeVar("T")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a service whose breaker is open"""
+
+    def __init__(self, service: str, retry_after: float):
+        super().__init__(f"{service} is unavailable (circuit open, next probe in {retry_after:.0f}s)")
+        self.service = service
+        self.retry_after = retry_after
+
+
+_breakers: List["CircuitBreaker"] = []
+
+
+class CircuitBreaker:
+    """
+    Failure tracking for one outbound service.
+
+    Thread-safe, so the synchronous clients used from worker threads share the
+    breaker with the async ones on the event loop.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURES,
+                 reset_timeout: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._next_probe_at = 0.0
+        self.counters = {"calls": 0, "failures": 0, "rejected": 0, "hedged": 0, "retried": 0}
+        self._lock = threading.Lock()
+        _breakers.append(self)
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; while open, one probe per reset_timeout is allowed"""
+        with self._lock:
+            if self.state != CLOSED:
+                now = time.monotonic()
+                if now < self._next_probe_at:
+                    self.counters["rejected"] += 1
+                    return False
+                # Probe; if it never reports back, the next one is allowed after another period
+                self.state = HALF_OPEN
+                self._next_probe_at = now + self.reset_timeout
+            self.counters["calls"] += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.counters["failures"] += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state == CLOSED:
+                    logger.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} failures")
+                    self.opened_at = time.time()
+                self.state = OPEN
+                self._next_probe_at = time.monotonic() + self.reset_timeout
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed; 0 while closed"""
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self._next_probe_at - time.monotonic())
+
+    def rejection(self) -> CircuitOpenError:
+        return CircuitOpenError(self.name, self.retry_after())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened_at": self.opened_at,
+                "retry_after": round(self.retry_after(), 1),
+                **self.counters
+            }
+
+
+def breaker_states() -> Dict[str, dict]:
+    """State of every circuit breaker, for the health endpoint"""
+    return {breaker.name: breaker.snapshot() for breaker in _breakers}
+
+
+circuit_open = Gauge(
+    "resumeiq_circuit_open", "1 while the circuit breaker of an outbound service is open or probing", ("service",),
+    function=lambda: {(breaker.name,): int(breaker.state != CLOSED) for breaker in _breakers}
+)
+
+
+def _discard(task: asyncio.Task, cleanup: Optional[Callable]):
+    """Cancel a losing attempt; release its result if it finished anyway"""
+    task.cancel()
+    if cleanup is None:
+        return
+
+    def release(finished: asyncio.Task):
+        if finished.cancelled() or finished.exception() is not None:
+            return
+        outcome = cleanup(finished.result())
+        if inspect.isawaitable(outcome):
+            asyncio.ensure_future(outcome)
+
+    task.add_done_callback(release)
+
+
+async def _hedged(breaker: CircuitBreaker, attempt: Callable[[], Awaitable[T]],
+                  hedge_after: Optional[float], cleanup: Optional[Callable]) -> T:
+    if not hedge_after:
+        return await attempt()
+
+    tasks = [asyncio.ensure_future(attempt())]
+    winner = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if done and tasks[0].exception() is None:
+            winner = tasks[0]
+            return winner.result()
+        breaker.counters["retried" if done else "hedged"] += 1
+        tasks.append(asyncio.ensure_future(attempt()))
+
+        pending = {task for task in tasks if not task.done()}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    return winner.result()
+        # Every attempt failed; report the most recent error
+        raise tasks[-1].exception()
+    finally:
+        for task in tasks:
+            if task is not winner:
+                _discard(task, cleanup)
+
+
+async def call_with_budget(breaker: CircuitBreaker, attempt: Callable[[], Awaitable[T]], budget: float,
+                           hedge_after: Optional[float] = None, cleanup: Optional[Callable] = None) -> T:
+    """
+    Call a service through its breaker within a latency budget.
+
+    Args:
+        breaker (CircuitBreaker): The service's breaker; success and failure are recorded on it
+        attempt (callable): Makes one call and returns its awaitable result; raises on failure
+        budget (float): Seconds the call may take in total, hedge included
+        hedge_after (float): Start a second attempt after this many seconds, or at once
+            if the first fails sooner; None or 0 disables hedging
+        cleanup (callable): Releases the result of an attempt that lost the race (e.g. closes a stream)
+
+    Returns:
+        The first successful result. Raises CircuitOpenError without calling while
+        the breaker is open, asyncio.TimeoutError when the budget runs out, or the
+        attempt's own error.
+    """
+    if not breaker.allow():
+        raise breaker.rejection()
+    try:
+        result = await asyncio.wait_for(_hedged(breaker, attempt, hedge_after, cleanup), budget)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
+
+
+def call_sync(breaker: CircuitBreaker, func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Blocking variant of call_with_budget without hedging; the budget is the
+    timeout func passes to its client.
+    """
+    if not breaker.allow():
+        raise breaker.rejection()
+    try:
+        result = func(*args, **kwargs)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
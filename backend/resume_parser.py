@@ -1,48 +1,50 @@
 import re
+import logging
+from typing import Union
+from backend.document import ResumeDocument
+from backend.name_extraction import extract_name
+from backend.skill_matcher import SkillMatcher
 
-# Make spaCy optional - fallback to basic extraction if not available
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-    SPACY_AVAILABLE = True
-except (ImportError, OSError):
-    SPACY_AVAILABLE = False
-    print("spaCy not available, using basic extraction methods")
+logger = logging.getLogger(__name__)
 
-def extract_resume_data(text: str) -> dict:
+# Skill vocabulary - the order here is the order skills are reported in
+SKILL_KEYWORDS = [
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'swift',
+    'html', 'css', 'sass', 'less', 'bootstrap', 'tailwind',
+    'react', 'angular', 'vue', 'svelte', 'jquery', 'flask', 'django', 'express', 'spring', 
+    'node.js', 'mongodb', 'mysql', 'postgresql', 'oracle', 'firebase',
+    'aws', 'azure', 'gcp', 'terraform', 'docker', 'kubernetes', 'jenkins',
+    'git', 'jira', 'figma', 'sketch', 'photoshop', 'illustrator',
+    'machine learning', 'deep learning', 'nlp', 'computer vision', 'data science',
+    'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy', 'matplotlib',
+    'tableau', 'power bi', 'excel', 'sql', 'nosql', 'rest api', 'graphql',
+    'agile', 'scrum', 'kanban', 'devops', 'ci/cd', 'unit testing', 'test automation'
+]
+
+# Compiled once at import and shared by every request
+SKILL_MATCHER = SkillMatcher(SKILL_KEYWORDS)
+
+def extract_resume_data(text: Union[str, ResumeDocument]) -> dict:
     """
     Extract key information from resume text
     
     Args:
-        text (str): The text content of the resume
+        text (str | ResumeDocument): The resume text, or its shared analysis document
         
     Returns:
         dict: Extracted data including name, email, phone, skills, etc.
+              skill_matches maps each skill to its match count and offsets.
     """
+    doc = ResumeDocument.of(text)
+    text = doc.text
+
     # Basic regex extractions that will always work
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    email_match = re.search(email_pattern, text)
-    email = email_match.group(0) if email_match else ""
-    
-    phone_pattern = r'\+?\d[\d\-\s]{8,}\d'
-    phone_match = re.search(phone_pattern, text)
-    phone = phone_match.group(0) if phone_match else ""
+    email = doc.email
+    phone = doc.phone
     
-    # Name extraction - fallback to first line if spaCy is not available
-    name = ""
-    if SPACY_AVAILABLE:
-        doc = nlp(text[:1000])  # Only process the first 1000 chars for performance
-        for ent in doc.ents:
-            if ent.label_ == "PERSON":
-                name = ent.text
-                break
-    
-    # Fallback name extraction if spaCy didn't find it
-    if not name:
-        lines = text.strip().split('\n')
-        if lines:
-            name = lines[0].strip()
-            
+    # Name from the header when it clearly is one, else spaCy's NER, else the first line
+    name = extract_name(text)
+
     # Education extraction
     education_patterns = [
         r'(?:EDUCATION|ACADEMIC BACKGROUND|QUALIFICATIONS)',
@@ -68,24 +70,9 @@ def extract_resume_data(text: str) -> dict:
         matches = re.findall(pattern, text, re.IGNORECASE)
         experience.extend(matches)
     
-    # Extract skills - comprehensive list
-    skill_keywords = [
-        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'swift',
-        'html', 'css', 'sass', 'less', 'bootstrap', 'tailwind',
-        'react', 'angular', 'vue', 'svelte', 'jquery', 'flask', 'django', 'express', 'spring', 
-        'node.js', 'mongodb', 'mysql', 'postgresql', 'oracle', 'firebase',
-        'aws', 'azure', 'gcp', 'terraform', 'docker', 'kubernetes', 'jenkins',
-        'git', 'jira', 'figma', 'sketch', 'photoshop', 'illustrator',
-        'machine learning', 'deep learning', 'nlp', 'computer vision', 'data science',
-        'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy', 'matplotlib',
-        'tableau', 'power bi', 'excel', 'sql', 'nosql', 'rest api', 'graphql',
-        'agile', 'scrum', 'kanban', 'devops', 'ci/cd', 'unit testing', 'test automation'
-    ]
-    
-    skills = []
-    for skill in skill_keywords:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
-            skills.append(skill)
+    # Skills are matched in a single pass over the lowercased text
+    skill_matches = doc.skill_matches
+    skills = list(skill_matches)
     
     return {
         "name": name,
@@ -93,5 +80,6 @@ def extract_resume_data(text: str) -> dict:
         "phone": phone,
         "skills": skills,
         "education": education[:3],  # Limit to first 3 for display purposes
-        "experience": experience[:3]  # Limit to first 3 for display purposes
+        "experience": experience[:3],  # Limit to first 3 for display purposes
+        "skill_matches": skill_matches  # Offsets and counts per matched skill
     }
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Progress of background work, shared between server workers.
+
+Suggestion streams and queued analyses run in the worker that accepted the
+upload, but with several workers the follow-up GET can land on any of them.
+Both record their progress here, keyed by ID, and the other workers answer
+from that record. RESUMEIQ_STATE_DB names a SQLite file every worker opens;
+gunicorn.conf.py sets one when it starts more than one worker. Unset, the
+store is off and lookups only see the worker's own streams and jobs.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Set
+
+from backend.executor import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+# SQLite file shared by the server workers; unset disables the store
+STATE_DB = os.getenv("RESUMEIQ_STATE_DB")
+# How long records stay readable after their last update
+STATE_TTL = float(os.getenv("RESUMEIQ_STATE_TTL", "900"))
+# Writes between sweeps of expired records
+_PRUNE_EVERY = 200
+
+
+class SharedState:
+    """
+    Latest record per (kind, key), e.g. ("job", job_id).
+
+    Every write carries a revision and never replaces a newer one, so records
+    written from background tasks may land out of order.
+    """
+
+    def __init__(self, db_path: Optional[str] = STATE_DB, ttl: float = STATE_TTL):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._pending: Set[asyncio.Task] = set()
+        self._db = None
+        self._connect()
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def _connect(self):
+        if not self.db_path:
+            return
+        try:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=1)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS shared_state ("
+                "kind TEXT, key TEXT, revision INTEGER, stored_at REAL, record TEXT, "
+                "PRIMARY KEY (kind, key))"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Shared state database unavailable, workers only see their own jobs: {str(e)}")
+            self._db = None
+
+    def reopen(self):
+        """Open a new connection in a forked worker; SQLite connections must not cross a fork"""
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._db = None
+        self._connect()
+
+    def put(self, kind: str, key: str, record: dict, revision: int):
+        if self._db is None:
+            return
+        payload = json.dumps(record)
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT INTO shared_state (kind, key, revision, stored_at, record) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (kind, key) DO UPDATE SET revision = excluded.revision, "
+                    "stored_at = excluded.stored_at, record = excluded.record "
+                    "WHERE excluded.revision >= shared_state.revision",
+                    (kind, key, revision, time.time(), payload)
+                )
+                self._writes += 1
+                if self._writes % _PRUNE_EVERY == 0:
+                    self._db.execute("DELETE FROM shared_state WHERE stored_at < ?", (time.time() - self.ttl,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Shared state write failed: {str(e)}")
+
+    def get(self, kind: str, key: str) -> Optional[dict]:
+        if self._db is None:
+            return None
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT stored_at, record FROM shared_state WHERE kind = ? AND key = ?", (kind, key)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Shared state read failed: {str(e)}")
+                return None
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return json.loads(row[1])
+
+    async def save(self, kind: str, key: str, record: dict, revision: int):
+        """Write a record off the event loop"""
+        if self._db is not None:
+            await run_in_thread(self.put, kind, key, record, revision)
+
+    def save_soon(self, kind: str, key: str, record: dict, revision: int):
+        """Write a record in the background, for callers that cannot await"""
+        if self._db is None:
+            return
+        task = asyncio.get_running_loop().create_task(self.save(kind, key, record, revision))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def load(self, kind: str, key: str) -> Optional[dict]:
+        """Read a record off the event loop; None when the store is off or has no live record"""
+        if self._db is None:
+            return None
+        return await run_in_thread(self.get, kind, key)
+
+
+shared_state = SharedState()
@@ -0,0 +1,288 @@
+"""
+Inverted skill index over a resume corpus.
+
+Each skill maps to a sorted array of row numbers (its posting list) and to a
+packed bitmap over all rows, which boolean queries combine with bitwise
+operations. The index is a directory of .npy files that is memory-mapped when
+opened, so every worker process shares the same pages and opening it costs
+next to nothing.
+
+Build it once from the corpus:
+    python -m backend.skill_index resume_dataset/01_people.csv -o resume_dataset/skill_index
+
+Then query it with boolean expressions such as "python AND aws AND NOT java",
+either through SkillIndex.search or the /search endpoint.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Index directory opened by the /search endpoint
+SKILL_INDEX_DIR = os.getenv("RESUMEIQ_SKILL_INDEX", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resume_dataset", "skill_index"
+))
+SKILL_INDEX_VERSION = 2
+
+_ARRAYS = ("postings", "posting_offsets", "bitmaps", "row_skills", "row_offsets", "scores", "ids")
+
+
+def build_index(texts: List[str], ids: np.ndarray, output_dir: str, source: str = "") -> dict:
+    """
+    Encode a corpus and write its skill index to output_dir.
+
+    Every skill the parser recognises gets a posting list. Rows are scored with
+    the same weights as score_resume (see backend.bulk_scoring); the scores only
+    rank the matches of a query.
+
+    Returns:
+        dict: The index metadata
+    """
+    from backend.bulk_scoring import KEYWORD_COLUMNS, encode_keywords, market_columns, score_matrix
+
+    matrix = encode_keywords(texts)
+    scores = score_matrix(market_columns(matrix))["score"].astype(np.int16)
+    by_skill = matrix.tocsc()
+    by_skill.sort_indices()
+
+    # skill x row membership, packed 8 rows per byte
+    bitmaps = np.packbits(by_skill.T.toarray() > 0, axis=1)
+
+    os.makedirs(output_dir, exist_ok=True)
+    arrays = {
+        "postings": by_skill.indices.astype(np.int32),
+        "posting_offsets": by_skill.indptr.astype(np.int64),
+        "bitmaps": bitmaps,
+        "row_skills": matrix.indices.astype(np.int16),
+        "row_offsets": matrix.indptr.astype(np.int64),
+        "scores": scores,
+        "ids": np.asarray(ids)
+    }
+    for name, values in arrays.items():
+        np.save(os.path.join(output_dir, f"{name}.npy"), values)
+    meta = {
+        "version": SKILL_INDEX_VERSION,
+        "skills": KEYWORD_COLUMNS,
+        "rows": matrix.shape[0],
+        "postings": int(matrix.nnz),
+        "source": source,
+        "built_at": time.time()
+    }
+    with open(os.path.join(output_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return meta
+
+
+# Boolean query grammar, loosest binding first:
+#   expr := term ("OR" term)*
+#   term := factor (["AND"] factor)*      adjacent factors are ANDed
+#   factor := "NOT" factor | "(" expr ")" | skill | "quoted skill"
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def tokenize(query: str) -> List[tuple]:
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKEN.match(query, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Unexpected character at position {position} in query")
+        position = match.end()
+        left, right, quoted, word = match.groups()
+        if left:
+            tokens.append(("(", None))
+        elif right:
+            tokens.append((")", None))
+        elif quoted is not None:
+            tokens.append(("skill", quoted.strip().lower()))
+        elif word.upper() in _OPERATORS:
+            tokens.append((word.upper(), None))
+        else:
+            tokens.append(("skill", word.lower()))
+    return tokens
+
+
+class _QueryParser:
+    """Recursive-descent parser producing nested tuples: ("and"|"or", a, b), ("not", a), ("skill", name)"""
+
+    def __init__(self, query: str):
+        self.tokens = tokenize(query)
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty query")
+        tree = self._expr()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected {self.tokens[self.position][0]!r} in query")
+        return tree
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def _expr(self):
+        tree = self._term()
+        while self._peek() == "OR":
+            self.position += 1
+            tree = ("or", tree, self._term())
+        return tree
+
+    def _term(self):
+        tree = self._factor()
+        while self._peek() in ("AND", "NOT", "(", "skill"):
+            if self._peek() == "AND":
+                self.position += 1
+            tree = ("and", tree, self._factor())
+        return tree
+
+    def _factor(self):
+        kind = self._peek()
+        if kind is None:
+            raise ValueError("Query ends unexpectedly")
+        self.position += 1
+        if kind == "NOT":
+            return ("not", self._factor())
+        if kind == "(":
+            tree = self._expr()
+            if self._peek() != ")":
+                raise ValueError("Missing closing parenthesis in query")
+            self.position += 1
+            return tree
+        if kind == "skill":
+            return ("skill", self.tokens[self.position - 1][1])
+        raise ValueError(f"Unexpected {kind!r} in query")
+
+
+def parse_query(query: str):
+    """Parse a boolean skill query; raises ValueError on malformed input"""
+    return _QueryParser(query).parse()
+
+
+class SkillIndex:
+    """A memory-mapped skill index directory written by build_index"""
+
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != SKILL_INDEX_VERSION:
+            raise ValueError(f"Skill index in {index_dir} has an unsupported version; rebuild it")
+        for name in _ARRAYS:
+            setattr(self, name, np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r"))
+        self.index_dir = index_dir
+        self.skills: List[str] = self.meta["skills"]
+        self.skill_ids: Dict[str, int] = {skill: i for i, skill in enumerate(self.skills)}
+        self.rows: int = self.meta["rows"]
+
+    def _skill_id(self, skill: str) -> int:
+        skill_id = self.skill_ids.get(skill.lower())
+        if skill_id is None:
+            raise ValueError(f"Unknown skill: {skill}")
+        return skill_id
+
+    def posting_list(self, skill: str) -> np.ndarray:
+        """Sorted row numbers of the resumes that have the skill"""
+        skill_id = self._skill_id(skill)
+        return self.postings[self.posting_offsets[skill_id]:self.posting_offsets[skill_id + 1]]
+
+    def _evaluate(self, tree) -> np.ndarray:
+        """Evaluate a parsed query to a packed bitmap of matching rows"""
+        kind = tree[0]
+        if kind == "skill":
+            return self.bitmaps[self._skill_id(tree[1])]
+        if kind == "not":
+            return np.invert(self._evaluate(tree[1]))
+        if kind == "and":
+            return np.bitwise_and(self._evaluate(tree[1]), self._evaluate(tree[2]))
+        return np.bitwise_or(self._evaluate(tree[1]), self._evaluate(tree[2]))
+
+    def match(self, query: str) -> np.ndarray:
+        """Sorted row numbers matching a boolean skill query"""
+        # count= drops the padding bits NOT sets past the last row
+        return np.flatnonzero(np.unpackbits(self._evaluate(parse_query(query)), count=self.rows))
+
+    def row_skill_names(self, row: int) -> List[str]:
+        return [self.skills[i] for i in self.row_skills[self.row_offsets[row]:self.row_offsets[row + 1]]]
+
+    def search(self, query: str, k: int = 20) -> dict:
+        """
+        Find the k highest-scoring resumes matching a boolean skill query.
+
+        Ties on score are broken by corpus order.
+
+        Returns:
+            dict: Total number of matches and the top k as {id, score, skills}
+        """
+        rows = self.match(query)
+        if k < len(rows):
+            scores = self.scores[rows]
+            # Partial sort of the best k, then order them; rows are already ascending
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.lexsort((rows[top], -scores[top]))]
+        else:
+            top = np.lexsort((rows, -self.scores[rows]))
+        return {
+            "total": int(len(rows)),
+            "results": [
+                {
+                    "id": self.ids[row].item(),
+                    "score": int(self.scores[row]),
+                    "skills": self.row_skill_names(row)
+                }
+                for row in rows[top]
+            ]
+        }
+
+
+_index: Optional[SkillIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_skill_index() -> Optional[SkillIndex]:
+    """Open the index at SKILL_INDEX_DIR on first use; returns None when it has not been built"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if not os.path.exists(os.path.join(SKILL_INDEX_DIR, "meta.json")):
+                    return None
+                _index = SkillIndex(SKILL_INDEX_DIR)
+                logger.info(f"Opened skill index with {_index.rows} resumes from {SKILL_INDEX_DIR}")
+    return _index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the inverted skill index for a CSV corpus")
+    parser.add_argument("input", help="CSV file, Parquet file or corpus store directory, e.g. resume_dataset/01_people.csv")
+    parser.add_argument("-o", "--output", default=SKILL_INDEX_DIR, help="Index directory")
+    parser.add_argument("--text-column", default="name", help="Column holding the resume text")
+    parser.add_argument("--id-column", default="person_id", help="Column returned as the result id")
+    args = parser.parse_args(argv)
+
+    from backend.corpus_store import read_corpus
+
+    started = time.perf_counter()
+    frame = read_corpus(args.input, [args.id_column, args.text_column])
+    texts = frame[args.text_column].astype(object).where(frame[args.text_column].notna(), "").tolist()
+    meta = build_index(texts, frame[args.id_column].to_numpy(), args.output,
+                       source=os.path.basename(args.input.rstrip(os.sep)))
+    logger.info(
+        f"Indexed {meta['rows']} resumes ({meta['postings']} postings) in "
+        f"{time.perf_counter() - started:.2f}s -> {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
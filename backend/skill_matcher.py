@@ -0,0 +1,140 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    """Mirror the definition of \\w used by the re module for str patterns"""
+    return ch.isalnum() or ch == "_"
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton that finds every skill keyword in a single pass.
+
+    Matches follow the same rules as ``re.search(r'\\b' + re.escape(skill) + r'\\b', text.lower())``
+    so results are interchangeable with the per-keyword regex scan it replaces, but the
+    text is walked once no matter how many keywords are registered.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._order: Dict[str, int] = {}
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if keyword and keyword not in self._order:
+                self._order[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+        self._build()
+
+    def _build(self):
+        # Trie of the keywords: goto[state] maps a character to the next state
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(index)
+
+        # Breadth-first pass computing failure links and folding them into the
+        # transition table so that scanning never has to follow a failure chain.
+        # Transitions back to depth 1 are left out of every row and resolved
+        # against the root row instead, which keeps the table linear in the
+        # vocabulary size.
+        root = goto[0]
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [{} for _ in goto]
+        queue = deque(root.values())
+        while queue:
+            state = queue.popleft()
+            inherited = delta[fail[state]]
+            transitions = dict(inherited)
+            for ch, nxt in goto[state].items():
+                fallback = inherited.get(ch)
+                fail[nxt] = fallback if fallback is not None else root.get(ch, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+                transitions[ch] = nxt
+                queue.append(nxt)
+            delta[state] = transitions
+
+        self._root = root
+        self._delta = delta
+        self._outputs = [tuple(out) for out in outputs]
+        self._lengths = [len(keyword) for keyword in self.keywords]
+        # Whether each keyword starts/ends with a word character decides how \b applies
+        self._word_start = [_is_word_char(keyword[0]) for keyword in self.keywords]
+        self._word_end = [_is_word_char(keyword[-1]) for keyword in self.keywords]
+
+    def scan(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Find all keyword occurrences in already-lowercased text.
+
+        Args:
+            text (str): Lowercased text to scan
+
+        Returns:
+            list: (keyword_index, start_offset) pairs in order of their end offset
+        """
+        delta = self._delta
+        root = self._root
+        outputs = self._outputs
+        lengths = self._lengths
+        word_start = self._word_start
+        word_end = self._word_end
+        n = len(text)
+        hits = []
+        state = 0
+        for end, ch in enumerate(text, 1):
+            nxt = delta[state].get(ch)
+            state = nxt if nxt is not None else root.get(ch, 0)
+            if not outputs[state]:
+                continue
+            for index in outputs[state]:
+                start = end - lengths[index]
+                # \b before the keyword: the preceding character must differ in "wordness"
+                before = start > 0 and _is_word_char(text[start - 1])
+                if before == word_start[index]:
+                    continue
+                # \b after the keyword: the following character must differ in "wordness"
+                after = end < n and _is_word_char(text[end])
+                if after == word_end[index]:
+                    continue
+                hits.append((index, start))
+        return hits
+
+    def find_all(self, text: str, lowered: bool = False) -> Dict[str, Dict]:
+        """
+        Locate every keyword in the text.
+
+        Args:
+            text (str): The text to search
+            lowered (bool): Set when the caller already lowercased the text
+
+        Returns:
+            dict: Keyword -> {"count", "offsets"} for matched keywords, in vocabulary order.
+                  Offsets are positions in the lowercased text.
+        """
+        if not lowered:
+            text = text.lower()
+        found: Dict[int, List[int]] = {}
+        last_end: Dict[int, int] = {}
+        for index, start in self.scan(text):
+            # re.finditer never reports overlapping occurrences of the same keyword
+            if start < last_end.get(index, 0):
+                continue
+            last_end[index] = start + self._lengths[index]
+            found.setdefault(index, []).append(start)
+        return {
+            self.keywords[index]: {"count": len(offsets), "offsets": offsets}
+            for index, offsets in sorted(found.items())
+        }
+
+    def match(self, text: str, lowered: bool = False) -> List[str]:
+        """Return the matched keywords in vocabulary order"""
+        return list(self.find_all(text, lowered=lowered))
@@ -0,0 +1,156 @@
+import gc
+import importlib
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Skip the background warm-up; heavy dependencies then load on the first request that needs them
+FAST_STARTUP = os.getenv("RESUMEIQ_FAST_STARTUP", "").lower() in ("1", "true", "yes")
+
+_PROCESS_START = time.perf_counter()
+_timings: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+_state = {"ready_at": None, "warmed_up_at": None, "warm_up_seconds": None, "preloaded": False}
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process can actually run on: its affinity mask, capped by the
+    container's CPU quota (cgroup v2 or v1), rather than every CPU of the host.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    for quota_file, period_file in (("/sys/fs/cgroup/cpu.max", None),
+                                    ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us")):
+        try:
+            with open(quota_file) as f:
+                values = f.read().split()
+            if period_file is not None:
+                with open(period_file) as f:
+                    values.append(f.read().strip())
+            quota, period = values[0], values[1]
+            if quota not in ("max", "-1"):
+                cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+            break
+        except (OSError, ValueError, IndexError):
+            continue
+    return max(cpus, 1)
+
+
+def record(name: str, phase: str, seconds: float):
+    """Record how long importing or loading a module/model took"""
+    with _lock:
+        _timings.setdefault(name, {})[phase] = round(seconds * 1000, 2)
+
+
+@contextmanager
+def timed(name: str, phase: str = "load"):
+    """Time a block and add it to the startup report under name/phase"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, phase, time.perf_counter() - start)
+
+
+def lazy_import(module_name: str):
+    """
+    Import a heavy dependency on first use and record the import time.
+
+    Later calls are a dictionary lookup in sys.modules.
+    """
+    import sys
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    with timed(module_name, "import"):
+        return importlib.import_module(module_name)
+
+
+def mark_ready():
+    """Note the moment the application finished starting up"""
+    _state["ready_at"] = round((time.perf_counter() - _PROCESS_START) * 1000, 2)
+
+
+def warm_up():
+    """
+    Load every heavy dependency and run one small analysis so the first real
+    request does not pay for it. Safe to call more than once.
+    """
+    from backend.document import ResumeDocument
+    from backend.job_ranking import job_ranker
+    from backend.metrics import unrecorded
+    from backend.name_extraction import get_name_nlp
+    from backend.pipeline import analyze_document
+    from backend.suggestions import get_openai_client
+
+    start = time.perf_counter()
+    for module_name in ("fitz", "docx2txt", "PIL.Image", "pytesseract", "sklearn.feature_extraction.text"):
+        try:
+            lazy_import(module_name)
+        except ImportError as e:
+            logger.warning(f"Warm-up could not import {module_name}: {str(e)}")
+    get_name_nlp()
+    get_openai_client()
+    job_ranker.get_vectorizer()
+    # The sample is not a request; keep it out of the stage histograms and counters
+    with timed("sample_analysis", "warm_up"), unrecorded():
+        analyze_document(ResumeDocument(
+            "Jane Doe\njane@example.com\nSkills\n- Python, SQL, AWS\nExperience\n- Built APIs"
+        ))
+    _state["warm_up_seconds"] = round(time.perf_counter() - start, 3)
+    _state["warmed_up_at"] = round((time.perf_counter() - _PROCESS_START) * 1000, 2)
+    logger.info(f"Warm-up finished in {_state['warm_up_seconds']}s")
+
+
+def preload_for_fork():
+    """
+    Load the models and data of every worker in the server's parent process,
+    before it forks them (gunicorn --preload, see gunicorn.conf.py).
+
+    Workers then share these pages copy-on-write instead of each loading its
+    own copy. The loaded objects are moved out of the garbage collector's reach
+    so collections in the workers do not write to, and so copy, those pages.
+    """
+    from backend.skill_index import get_skill_index
+
+    warm_up()
+    with timed("skill_index", "preload"):
+        get_skill_index()
+    gc.collect()
+    gc.freeze()
+    _state["preloaded"] = True
+    logger.info(f"Preloaded {gc.get_freeze_count()} objects for the workers")
+
+
+def after_fork():
+    """Replace what a worker must not share with the parent it was forked from"""
+    from backend.analysis_cache import analysis_cache
+    from backend.job_api import job_cache
+    from backend.shared_state import shared_state
+
+    analysis_cache.reopen()
+    job_cache.reopen()
+    shared_state.reopen()
+
+
+def startup_report() -> dict:
+    """Per-module import and load times in milliseconds, plus overall milestones"""
+    with _lock:
+        timings = {name: dict(phases) for name, phases in _timings.items()}
+    return {
+        "fast_startup": FAST_STARTUP,
+        "ready_ms": _state["ready_at"],
+        "warmed_up_ms": _state["warmed_up_at"],
+        "warm_up_seconds": _state["warm_up_seconds"],
+        "preloaded": _state["preloaded"],
+        "modules": dict(sorted(timings.items(), key=lambda item: -sum(item[1].values())))
+    }
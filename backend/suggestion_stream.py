@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from backend.document import ResumeDocument
+from backend.logging_setup import record_stage
+from backend.metrics import stage_seconds
+from backend.resilience import CircuitOpenError
+from backend.shared_state import shared_state
+from backend.suggestions import format_suggestions, get_fallback_suggestions, parse_suggestions, stream_suggestion_tokens
+
+logger = logging.getLogger(__name__)
+
+# How long finished streams stay available to late or reconnecting clients
+SUGGESTION_STREAM_TTL = float(os.getenv("SUGGESTION_STREAM_TTL", "900"))
+SUGGESTION_STREAM_LIMIT = int(os.getenv("SUGGESTION_STREAM_LIMIT", "1000"))
+# Seconds between reads of the shared state while following another worker's stream
+REMOTE_POLL_INTERVAL = 0.5
+
+
+class SuggestionStream:
+    """
+    Suggestions for one analysis, generated in the background.
+
+    Tokens are appended as the model produces them; once the reply is complete
+    the parsed suggestions are published and the stream is marked done.
+    """
+
+    def __init__(self, analysis_id: Optional[str] = None):
+        self.analysis_id = analysis_id or uuid.uuid4().hex
+        self.created_at = time.time()
+        self.tokens: List[str] = []
+        self.suggestions: Optional[list] = None
+        self.source: Optional[str] = None
+        self.status = "pending"
+        self._changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("complete", "failed")
+
+    async def publish_token(self, text: str):
+        async with self._changed:
+            self.tokens.append(text)
+            self.status = "streaming"
+            self._changed.notify_all()
+
+    async def finish(self, suggestions: list, source: str, status: str = "complete"):
+        async with self._changed:
+            self.suggestions = suggestions
+            self.source = source
+            self.status = status
+            self._changed.notify_all()
+        await shared_state.save("suggestions", self.analysis_id, self.record(), 1)
+
+    def record(self) -> dict:
+        """What other server workers need to answer for this stream (see backend.shared_state)"""
+        return {"created_at": self.created_at, "tokens": list(self.tokens), "suggestions": self.suggestions,
+                "source": self.source, "status": self.status}
+
+    def _apply(self, record: dict):
+        self.created_at = record["created_at"]
+        self.tokens = record["tokens"]
+        self.suggestions = record["suggestions"]
+        self.source = record["source"]
+        self.status = record["status"]
+
+    def snapshot(self, since: int = 0) -> dict:
+        """Current state for polling clients; pass `next` back as `since` to get only new tokens"""
+        return {
+            "analysis_id": self.analysis_id,
+            "status": self.status,
+            "tokens": self.tokens[since:],
+            "next": len(self.tokens),
+            "suggestions": self.suggestions,
+            "source": self.source
+        }
+
+    async def events(self, since: int = 0) -> AsyncIterator[dict]:
+        """Yield token events as they arrive, then one final "done" event"""
+        position = since
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.tokens) > position or self.done)
+                new_tokens = self.tokens[position:]
+                finished = self.done
+            for token in new_tokens:
+                yield {"type": "token", "text": token}
+            position += len(new_tokens)
+            if finished and position >= len(self.tokens):
+                yield {"type": "done", "status": self.status, "suggestions": self.suggestions, "source": self.source}
+                return
+
+
+class RecordedStream(SuggestionStream):
+    """
+    A stream generated by another server worker, read from the shared state.
+
+    Only the start and the end of a stream are recorded, so tokens arrive all
+    at once when it completes.
+    """
+
+    @classmethod
+    def from_record(cls, analysis_id: str, record: dict) -> "RecordedStream":
+        stream = cls(analysis_id)
+        stream._apply(record)
+        return stream
+
+    async def events(self, since: int = 0) -> AsyncIterator[dict]:
+        while not self.done:
+            await asyncio.sleep(REMOTE_POLL_INTERVAL)
+            record = await shared_state.load("suggestions", self.analysis_id)
+            if record is None:
+                # Expired before it finished; end the stream rather than wait forever
+                self.status = "failed"
+                break
+            self._apply(record)
+        async for event in super().events(since):
+            yield event
+
+
+_streams: "OrderedDict[str, SuggestionStream]" = OrderedDict()
+
+
+def _prune():
+    now = time.time()
+    while _streams:
+        oldest = next(iter(_streams.values()))
+        if len(_streams) <= SUGGESTION_STREAM_LIMIT and now - oldest.created_at <= SUGGESTION_STREAM_TTL:
+            break
+        _streams.popitem(last=False)
+        if oldest.task is not None and not oldest.done:
+            oldest.task.cancel()
+
+
+def get_stream(analysis_id: str) -> Optional[SuggestionStream]:
+    return _streams.get(analysis_id)
+
+
+async def find_stream(analysis_id: str) -> Optional[SuggestionStream]:
+    """The stream of an analysis, whichever server worker generates it"""
+    stream = _streams.get(analysis_id)
+    if stream is not None:
+        return stream
+    record = await shared_state.load("suggestions", analysis_id)
+    return RecordedStream.from_record(analysis_id, record) if record is not None else None
+
+
+async def generate_suggestions(doc: ResumeDocument, stream: Optional[SuggestionStream] = None) -> Tuple[list, str]:
+    """
+    Generate suggestions with the streaming OpenAI API, publishing tokens to the stream if given.
+
+    Returns:
+        tuple: (suggestions, source). suggestions are formatted {category, text}
+               items; source is "ai-powered", or "fallback" when OpenAI is not
+               configured or the call fails
+    """
+    parts = []
+    source = "ai-powered"
+    start = time.perf_counter()
+    try:
+        async for token in stream_suggestion_tokens(doc):
+            parts.append(token)
+            if stream is not None:
+                await stream.publish_token(token)
+        improvement = parse_suggestions("".join(parts)) if parts else get_fallback_suggestions()
+    except asyncio.CancelledError:
+        raise
+    except CircuitOpenError as e:
+        logger.debug(str(e))
+        improvement = get_fallback_suggestions()
+    except asyncio.TimeoutError:
+        logger.warning("OpenAI suggestions exceeded their latency budget, using fallback")
+        improvement = get_fallback_suggestions()
+    except Exception as e:
+        logger.error(f"Error generating suggestions with OpenAI: {str(e)}")
+        improvement = get_fallback_suggestions()
+    if not isinstance(improvement, dict):
+        source = "fallback"
+    suggestions = format_suggestions(improvement)
+    elapsed = time.perf_counter() - start
+    stage_seconds.observe(elapsed, stage="suggestions")
+    record_stage("suggestions", elapsed)
+    if stream is not None:
+        await stream.finish(suggestions, source)
+    return suggestions, source
+
+
+def start_suggestion_stream(doc: ResumeDocument,
+                            on_complete: Optional[Callable[[list, str], Awaitable[None]]] = None) -> SuggestionStream:
+    """
+    Start generating suggestions in the background and return the stream clients follow.
+
+    Args:
+        doc (ResumeDocument): The analysis document of the upload
+        on_complete (callable): Awaited with the final suggestions and their source once generation succeeds
+    """
+    _prune()
+    stream = SuggestionStream()
+    _streams[stream.analysis_id] = stream
+    shared_state.save_soon("suggestions", stream.analysis_id, stream.record(), 0)
+
+    async def run():
+        try:
+            suggestions, source = await generate_suggestions(doc, stream)
+            if on_complete is not None:
+                await on_complete(suggestions, source)
+        except asyncio.CancelledError:
+            if not stream.done:
+                await stream.finish(get_fallback_suggestions(), "fallback", status="failed")
+            raise
+        except Exception as e:
+            logger.error(f"Suggestion stream {stream.analysis_id} failed: {str(e)}")
+            if not stream.done:
+                await stream.finish(get_fallback_suggestions(), "fallback", status="failed")
+
+    stream.task = asyncio.create_task(run())
+    return stream
+
+
+async def cancel_streams():
+    """Stop unfinished generation tasks; called when the application shuts down"""
+    tasks = [s.task for s in _streams.values() if s.task is not None and not s.task.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,107 +1,252 @@
 import re
 import os
+import asyncio
 import logging
-from openai import OpenAI
-from dotenv import load_dotenv
+import threading
 import json
+from typing import AsyncIterator, Union
+from backend.document import ResumeDocument
+from backend.resilience import CircuitBreaker, CircuitOpenError, call_sync, call_with_budget
+from backend.startup import lazy_import, timed
 
-# Load environment variables
-load_dotenv()
-
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client with proper configuration
-try:
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+# Latency budgets: until the first streamed token, and for the whole reply
+OPENAI_FIRST_TOKEN_BUDGET = float(os.getenv("OPENAI_FIRST_TOKEN_BUDGET", "10"))
+OPENAI_BUDGET = float(os.getenv("OPENAI_BUDGET", "45"))
+# Open a second, hedged stream when the first has produced no token after this many seconds (0 disables)
+OPENAI_HEDGE_AFTER = float(os.getenv("OPENAI_HEDGE_AFTER", "0"))
+
+# While open, suggestions fall back to the rule-based ones without calling OpenAI
+openai_breaker = CircuitBreaker("openai")
+
+# OpenAI client, built on first use
+_client = None
+_client_loaded = False
+_client_lock = threading.Lock()
+
+def get_openai_client():
+    """Create the OpenAI client on first call; returns None when no API key is configured"""
+    global _client, _client_loaded
+    if _client_loaded:
+        return _client
+    with _client_lock:
+        if not _client_loaded:
+            try:
+                api_key = os.getenv('OPENAI_API_KEY')
+                if not api_key:
+                    logger.warning("OpenAI API key not found in environment variables")
+                    _client = None
+                else:
+                    openai = lazy_import("openai")
+                    with timed("openai_client"):
+                        _client = openai.OpenAI(
+                            api_key=api_key,
+                            base_url=OPENAI_BASE_URL  # Explicitly set the base URL
+                        )
+            except Exception as e:
+                logger.error(f"Failed to initialize OpenAI client: {str(e)}")
+                _client = None
+            _client_loaded = True
+    return _client
+
+# Async clients hold connections tied to the event loop that opened them
+_async_client = None
+_async_client_loop = None
+
+def get_async_openai_client():
+    """Return the async OpenAI client for the running event loop, or None without an API key"""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client_loop is loop:
+        return _async_client
     api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        logger.warning("OpenAI API key not found in environment variables")
-        client = None
-    else:
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.openai.com/v1"  # Explicitly set the base URL
-        )
-except Exception as e:
-    logger.error(f"Failed to initialize OpenAI client: {str(e)}")
-    client = None
+    _async_client = None
+    if api_key:
+        try:
+            openai = lazy_import("openai")
+            _async_client = openai.AsyncOpenAI(api_key=api_key, base_url=OPENAI_BASE_URL)
+        except Exception as e:
+            logger.error(f"Failed to initialize async OpenAI client: {str(e)}")
+    _async_client_loop = loop
+    return _async_client
 
 # Comment out the OpenAI import and API key to avoid errors
 # import openai
 # openai.api_key = "your-api-key" (don't use the key from your file as it might not be valid)
 
-def suggest_improvements(resume_text: str) -> dict:
+def build_messages(resume_text: str) -> list:
+    """Chat messages asking the model to review a resume"""
+    # Create a prompt for OpenAI
+    prompt = f"""Analyze the following resume and provide specific, actionable improvements in these categories:
+    1. Format and Structure
+    2. Content and Impact
+    3. Skills and Keywords
+    4. Professional Branding
+    5. Action Words and Language
+
+    Resume:
+    {resume_text}
+
+    Please provide detailed, specific suggestions for each category. Focus on modern resume best practices and industry standards.
+    Format the response as a JSON-like structure with categories as keys and lists of suggestions as values.
+    Keep suggestions concise but actionable."""
+    return [
+        {"role": "system", "content": "You are a professional resume reviewer and career coach. Provide specific, actionable suggestions to improve resumes."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_suggestions(suggestions_text: str):
+    """
+    Turn the model's reply into the suggestions result
+    
+    Returns:
+        dict | list: {"suggestions", "source"} for a usable reply, fallback suggestions otherwise
+    """
+    # If the API call was successful but returned no suggestions, use fallback
+    if not suggestions_text:
+        logger.warning("OpenAI returned empty suggestions, using fallback")
+        return get_fallback_suggestions()
+
+    # Try to parse the response as JSON
+    try:
+        # Remove any markdown formatting if present
+        clean_text = suggestions_text.replace("```json", "").replace("```", "").strip()
+        suggestions_dict = json.loads(clean_text)
+        logger.info("Successfully parsed OpenAI suggestions as JSON")
+        return {
+            "suggestions": suggestions_dict,
+            "source": "ai-powered"
+        }
+    except json.JSONDecodeError:
+        # If JSON parsing fails, return the raw text
+        logger.info("Returning raw OpenAI suggestions")
+        return {
+            "suggestions": suggestions_text,
+            "source": "ai-powered"
+        }
+
+def suggest_improvements(resume_text: Union[str, ResumeDocument]) -> dict:
     """
     Generate personalized resume improvement suggestions using OpenAI.
     
     Args:
-        resume_text (str): The text content of the resume
+        resume_text (str | ResumeDocument): The resume text, or its shared analysis document
         
     Returns:
         dict: A dictionary containing various improvement suggestions
     """
+    client = get_openai_client()
     if not client:
         logger.warning("OpenAI client not available, using fallback suggestions")
         return get_fallback_suggestions()
 
+    resume_text = ResumeDocument.of(resume_text).text
     try:
-        # Create a prompt for OpenAI
-        prompt = f"""Analyze the following resume and provide specific, actionable improvements in these categories:
-        1. Format and Structure
-        2. Content and Impact
-        3. Skills and Keywords
-        4. Professional Branding
-        5. Action Words and Language
-
-        Resume:
-        {resume_text}
-
-        Please provide detailed, specific suggestions for each category. Focus on modern resume best practices and industry standards.
-        Format the response as a JSON-like structure with categories as keys and lists of suggestions as values.
-        Keep suggestions concise but actionable."""
-
         # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional resume reviewer and career coach. Provide specific, actionable suggestions to improve resumes."},
-                {"role": "user", "content": prompt}
-            ],
+        response = call_sync(
+            openai_breaker,
+            client.chat.completions.create,
+            model=OPENAI_MODEL,
+            messages=build_messages(resume_text),
             temperature=0.7,
-            max_tokens=1000
+            max_tokens=1000,
+            timeout=OPENAI_BUDGET
         )
 
         # Extract and parse the suggestions
-        suggestions_text = response.choices[0].message.content
-
-        # If the API call was successful but returned no suggestions, use fallback
-        if not suggestions_text:
-            logger.warning("OpenAI returned empty suggestions, using fallback")
-            return get_fallback_suggestions()
-
-        # Try to parse the response as JSON
-        try:
-            # Remove any markdown formatting if present
-            clean_text = suggestions_text.replace("```json", "").replace("```", "").strip()
-            suggestions_dict = json.loads(clean_text)
-            logger.info("Successfully parsed OpenAI suggestions as JSON")
-            return {
-                "suggestions": suggestions_dict,
-                "source": "ai-powered"
-            }
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return the raw text
-            logger.info("Returning raw OpenAI suggestions")
-            return {
-                "suggestions": suggestions_text,
-                "source": "ai-powered"
-            }
+        return parse_suggestions(response.choices[0].message.content)
 
+    except CircuitOpenError as e:
+        logger.warning(f"{str(e)}, using fallback suggestions")
+        return get_fallback_suggestions()
     except Exception as e:
         logger.error(f"Error generating suggestions with OpenAI: {str(e)}")
         return get_fallback_suggestions()
 
+async def stream_suggestion_tokens(resume_text: Union[str, ResumeDocument]) -> AsyncIterator[str]:
+    """
+    Stream the model's reply token by token without blocking the event loop.
+
+    The first token must arrive within OPENAI_FIRST_TOKEN_BUDGET (hedged with a
+    second stream after OPENAI_HEDGE_AFTER if enabled) and the whole reply within
+    OPENAI_BUDGET; outcomes are recorded on the OpenAI circuit breaker.
+
+    Yields nothing when no OpenAI client is configured; errors, including
+    CircuitOpenError and asyncio.TimeoutError, propagate to the caller.
+    """
+    client = get_async_openai_client()
+    if not client:
+        return
+    resume_text = ResumeDocument.of(resume_text).text
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + OPENAI_BUDGET
+
+    async def open_stream():
+        stream = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=build_messages(resume_text),
+            temperature=0.7,
+            max_tokens=1000,
+            stream=True
+        )
+        try:
+            chunks = stream.__aiter__()
+            return stream, chunks, await _next_token(chunks)
+        except BaseException:
+            await stream.close()
+            raise
+
+    stream, chunks, token = await call_with_budget(
+        openai_breaker, open_stream, OPENAI_FIRST_TOKEN_BUDGET, OPENAI_HEDGE_AFTER,
+        cleanup=lambda opened: opened[0].close()
+    )
+    try:
+        while token is not None:
+            yield token
+            token = await asyncio.wait_for(_next_token(chunks), max(0.0, deadline - loop.time()))
+    except Exception:
+        openai_breaker.record_failure()
+        raise
+    finally:
+        await stream.close()
+
+async def _next_token(chunks) -> Union[str, None]:
+    """The next non-empty content delta of a completion stream; None at the end"""
+    async for chunk in chunks:
+        if chunk.choices and chunk.choices[0].delta.content:
+            return chunk.choices[0].delta.content
+    return None
+
+def format_suggestions(improvement) -> list:
+    """Normalize the output of suggest_improvements into a list of {category, text} items"""
+    formatted_suggestions = []
+    if isinstance(improvement, dict) and "suggestions" in improvement:
+        if isinstance(improvement["suggestions"], dict):
+            for category, items in improvement["suggestions"].items():
+                if isinstance(items, list):
+                    for item in items:
+                        formatted_suggestions.append({
+                            "category": category.replace("_", " ").title(),
+                            "text": item
+                        })
+                else:
+                    formatted_suggestions.append({
+                        "category": category.replace("_", " ").title(),
+                        "text": items
+                    })
+        elif isinstance(improvement["suggestions"], list):
+            formatted_suggestions = improvement["suggestions"]
+        else:
+            formatted_suggestions = [{"category": "General", "text": str(improvement["suggestions"])}]
+    elif isinstance(improvement, list):
+        formatted_suggestions = improvement
+    else:
+        formatted_suggestions = [{"category": "General", "text": str(improvement)}]
+    return formatted_suggestions
+
 def get_fallback_suggestions() -> list:
     """Provide fallback suggestions when the API call fails"""
     return [
@@ -119,22 +264,24 @@ def suggest_improvements_without_openai(text):
     Analyze a resume and suggest improvements without relying on external APIs.
     
     Args:
-        text (str): The text content of the resume
+        text (str | ResumeDocument): The resume text, or its shared analysis document
         
     Returns:
         str: A string containing improvement suggestions
     """
+    doc = ResumeDocument.of(text)
+    text = doc.text
     suggestions = []
     
     # Check for resume length
-    word_count = len(text.split())
+    word_count = doc.word_count
     if word_count < 300:
         suggestions.append("Your resume is quite short. Consider adding more details about your experiences and achievements.")
     elif word_count > 1000:
         suggestions.append("Your resume is quite long. Consider focusing on the most relevant experiences and skills.")
     
     # Check for action verbs at the beginning of bullet points
-    bullet_points = re.findall(r'[•\-\*]\s*(.*?)(?:\n|$)', text)
+    bullet_points = doc.bullets
     weak_bullets = 0
     
     action_verbs = ["achieved", "implemented", "developed", "created", "managed", "led", "designed", "built"]
@@ -151,18 +298,18 @@ def suggest_improvements_without_openai(text):
         suggestions.append("Include quantifiable achievements (e.g., 'Increased sales by 20%', 'Reduced costs by $10K').")
     
     # Check for LinkedIn profile
-    if not re.search(r'linkedin\.com|linkedin', text, re.IGNORECASE):
+    if not doc.has_linkedin:
         suggestions.append("Consider adding your LinkedIn profile URL.")
     
     # Check for ATS-friendly formatting
-    if not re.search(r'skills|education|experience|projects', text, re.IGNORECASE):
+    if not any(label in doc.lower for label in ('skills', 'education', 'experience', 'projects')):
         suggestions.append("Make sure to clearly label your sections (Skills, Education, Experience, Projects) for ATS systems.")
     
     # Check for contact information
-    if not re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text):
+    if not doc.email:
         suggestions.append("Ensure your email address is included and clearly visible.")
     
-    if not re.search(r'\+?\d[\d\-\s]{8,}\d', text):
+    if not doc.phone:
         suggestions.append("Include a phone number for employers to contact you.")
     
     # Default suggestions if none were found
@@ -0,0 +1 @@
+"""Latency benchmarks for the analysis pipeline; run with python -m benchmarks.run"""
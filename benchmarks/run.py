@@ -0,0 +1,244 @@
+"""
+Per-stage latency benchmarks for the analysis pipeline.
+
+Runs every analysis stage and the full /upload_resume/ path on synthetic
+resumes from 1 KB to 1 MB and reports latency percentiles and throughput.
+OpenAI is disabled and job search returns mock listings, so no network
+calls are made and the numbers only reflect this code.
+
+Usage:
+    python -m benchmarks.run                               # print results
+    python -m benchmarks.run --save-baseline baseline.json # record a baseline on this machine
+    python -m benchmarks.run --baseline baseline.json      # exit 1 on regressions
+
+Every stage is measured in several rounds, interleaved with the other stages
+so a burst of background load hits all of them alike. A stage regresses when
+the median of its round medians is slower than the baseline's by more than the
+tolerance and by more than the rounds of the two runs spread apart together,
+so a rerun of unchanged code does not fail.
+
+Baselines are machine-specific; record them on the machine you compare on.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# External services are stubbed before any backend module reads its configuration
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["RESUMEIQ_FAST_STARTUP"] = "1"
+os.environ.pop("ANALYSIS_CACHE_DB", None)
+os.environ.pop("JOB_CACHE_DB", None)
+
+from benchmarks.synthetic import generate_resume, to_docx, to_pdf  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+SIZES = {"1KB": 1024, "10KB": 10 * 1024, "100KB": 100 * 1024, "1MB": 1024 * 1024}
+# Relative slowdown of the median tolerated before a stage counts as regressed
+DEFAULT_TOLERANCE = 0.25
+# Measuring rounds per stage; the comparison uses the median and spread of the round medians
+DEFAULT_ROUNDS = 5
+# Differences below this many milliseconds are timer noise, never regressions
+NOISE_FLOOR_MS = 0.05
+
+
+def measure(func: Callable[[], object], min_runs: int, max_runs: int, min_seconds: float) -> List[float]:
+    """Time func after one warm-up call; runs until both min_runs and min_seconds are reached"""
+    func()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_runs and (len(timings) < min_runs or time.perf_counter() - started < min_seconds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(rounds: List[List[float]], size: int) -> dict:
+    """Percentiles over all runs, plus the median of every round for comparisons"""
+    ordered = sorted(t for timings in rounds for t in timings)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    mean = statistics.fmean(ordered)
+    round_medians = [round(statistics.median(timings), 4) for timings in rounds]
+    return {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(round_medians), 4),
+        "round_medians_ms": round_medians,
+        "p50_ms": round(percentile(50), 4),
+        "p90_ms": round(percentile(90), 4),
+        "p99_ms": round(percentile(99), 4),
+        "mean_ms": round(mean, 4),
+        "per_second": round(1000 / mean, 2) if mean else None,
+        "mb_per_second": round(size / 1e6 / (mean / 1000), 2) if mean else None
+    }
+
+
+def _stub_job_search():
+    """Serve mock listings instead of calling JSearch"""
+    from backend import pipeline
+    from backend.job_api import get_mock_jobs
+
+    async def get_jobs_for_skills(skills, countries=("in", "us"), live_per_country=None, deadline=None):
+        return [{country: get_mock_jobs(skill, country) for country in countries} for skill in skills]
+
+    pipeline.get_jobs_for_skills = get_jobs_for_skills
+
+
+def stage_benchmarks(text: str) -> Tuple[Dict[str, Callable[[], object]], Dict[str, bytes]]:
+    """
+    The analysis stages, each called on the raw text so every run does the
+    full work, plus the text rendered as upload files by extension.
+    """
+    from backend.extraction import extract_text
+    from backend.resume_parser import extract_resume_data
+    from backend.scoring import calculate_ats_score, score_resume
+    from backend.suggestions import suggest_improvements_without_openai
+
+    skills = extract_resume_data(text)["skills"]
+    files = {"txt": text.encode("utf-8"), "pdf": to_pdf(text), "docx": to_docx(text)}
+    benchmarks = {f"extract_text:{ext}": (lambda c=contents, e=ext: extract_text(c, e)) for ext, contents in files.items()}
+    benchmarks.update({
+        "extract_resume_data": lambda: extract_resume_data(text),
+        "calculate_ats_score": lambda: calculate_ats_score(text, skills),
+        "score_resume": lambda: score_resume(skills),
+        "suggest_improvements_without_openai": lambda: suggest_improvements_without_openai(text),
+    })
+    return benchmarks, files
+
+
+def upload_benchmarks(client, files: Dict[str, bytes]) -> Dict[str, Callable[[], object]]:
+    """
+    The full upload path through the HTTP app. Every call uploads different
+    bytes so the analysis cache never answers instead of the pipeline.
+    """
+    counter = iter(range(10 ** 9))
+
+    def upload(ext: str):
+        # Trailing bytes change the content hash; PDF readers ignore data after %%EOF
+        suffix = f"\n%{next(counter)}\n".encode()
+        response = client.post(
+            "/upload_resume/", params={"wait_for_suggestions": "true"},
+            files={"file": (f"resume.{ext}", files[ext] + suffix)}
+        )
+        body = response.json()
+        if response.status_code != 200 or "error" in body:
+            raise RuntimeError(f"Upload of a .{ext} resume failed: {body}")
+        return body
+
+    return {f"upload_resume:{ext}": (lambda e=ext: upload(e)) for ext in ("txt", "pdf")}
+
+
+def run(sizes: List[str], min_runs: int, max_runs: int, min_seconds: float,
+        stage_filter: Optional[str] = None, rounds: int = DEFAULT_ROUNDS) -> dict:
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    _stub_job_search()
+    results = {}
+    with TestClient(app) as client:
+        benchmarks: Dict[str, Tuple[Callable[[], object], int]] = {}
+        for label in sizes:
+            text = generate_resume(SIZES[label])
+            stages, files = stage_benchmarks(text)
+            stages.update(upload_benchmarks(client, files))
+            benchmarks.update({f"{stage}@{label}": (func, SIZES[label]) for stage, func in stages.items()
+                               if not stage_filter or stage_filter in stage})
+
+        timings: Dict[str, List[List[float]]] = {name: [] for name in benchmarks}
+        for _ in range(max(rounds, 1)):
+            for name, (func, _size) in benchmarks.items():
+                # Garbage left by the previous stage is not charged to this one
+                gc.collect()
+                timings[name].append(measure(func, min_runs, max_runs, min_seconds))
+
+        for name, (_func, size) in benchmarks.items():
+            results[name] = summarize(timings[name], size)
+            logger.info(f"{name:<52} median {results[name]['median_ms']:>10.3f} ms   "
+                        f"p90 {results[name]['p90_ms']:>10.3f} ms   {results[name]['per_second']:>10.1f}/s")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        },
+        "results": results
+    }
+
+
+def _round_medians(result: dict) -> List[float]:
+    # Baselines recorded before rounds existed only have the overall median
+    return result.get("round_medians_ms") or [result["p50_ms"]]
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Stages whose median of round medians got slower than the baseline by more
+    than the tolerance and by more than the noise: the spreads between the
+    fastest and slowest round of both runs added up, at least NOISE_FLOOR_MS.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        before_rounds, after_rounds = _round_medians(previous), _round_medians(result)
+        before, after = statistics.median(before_rounds), statistics.median(after_rounds)
+        noise = max(max(before_rounds) - min(before_rounds) + max(after_rounds) - min(after_rounds), NOISE_FLOOR_MS)
+        if after > before * (1 + tolerance) and after - before > noise:
+            regressions.append(f"{name}: median {before:.3f} ms -> {after:.3f} ms "
+                               f"(+{(after / before - 1) * 100:.0f}%, noise {noise:.3f} ms)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline stage by stage")
+    parser.add_argument("--sizes", nargs="*", choices=list(SIZES), default=list(SIZES), help="Resume sizes to run")
+    parser.add_argument("--stage", default=None, help="Only run stages whose name contains this text")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help="Measuring rounds per stage, interleaved with the other stages")
+    parser.add_argument("--min-runs", type=int, default=5, help="Minimum runs per stage and round")
+    parser.add_argument("--max-runs", type=int, default=200, help="Maximum runs per stage and round")
+    parser.add_argument("--min-seconds", type=float, default=0.3, help="Minimum measuring time per stage and round")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    parser.add_argument("--baseline", default=None, help="Compare against a baseline and exit 1 on regressions")
+    parser.add_argument("--save-baseline", default=None, help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown of the median (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.min_runs, args.max_runs, args.min_seconds, args.stage, args.rounds)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            details = "\n  ".join(regressions)
+            logger.error(f"Performance regressions against {args.baseline}:\n  {details}")
+            return 1
+        logger.info(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    # Only warnings from the application and its libraries, so the report stays readable
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    logger.setLevel(logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Deterministic synthetic resumes for benchmarking.
+
+The same size and seed always produce the same text, so timings from
+different runs and machines are measured on identical input.
+"""
+import io
+import random
+import zipfile
+from typing import List
+from xml.sax.saxutils import escape
+
+FIRST_NAMES = ["Jane", "John", "Priya", "Arjun", "Maria", "Wei", "Fatima", "Lucas", "Aisha", "Noah"]
+LAST_NAMES = ["Doe", "Sharma", "Garcia", "Chen", "Okafor", "Silva", "Patel", "Kim", "Novak", "Smith"]
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Node.js", "Django", "Flask", "AWS", "Azure",
+    "Docker", "Kubernetes", "SQL", "PostgreSQL", "MongoDB", "Machine Learning", "TensorFlow", "Git",
+    "CI/CD", "REST API", "GraphQL", "Pandas", "Spark", "Terraform", "Linux", "C++", "Go", "Redis"
+]
+VERBS = ["Built", "Designed", "Led", "Optimized", "Migrated", "Automated", "Delivered", "Reduced", "Scaled"]
+OBJECTS = [
+    "a payments API", "the data pipeline", "CI/CD for 12 services", "a recommendation engine",
+    "the monitoring stack", "an internal analytics dashboard", "the search backend", "release tooling"
+]
+OUTCOMES = [
+    "cutting latency by {n}%", "serving {n}k daily users", "saving ${n}k per year",
+    "improving conversion by {n}%", "reducing incidents by {n}%", "for {n} enterprise customers"
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def generate_resume(size: int, seed: int = 0) -> str:
+    """
+    A resume of about `size` bytes: contact header, summary, skills and
+    education, then work history repeated until the size is reached.
+    """
+    rng = random.Random(f"{seed}:{size}")
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines: List[str] = [
+        name,
+        f"{name.split()[0].lower()}.{name.split()[1].lower()}@example.com | +1 (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        f"linkedin.com/in/{name.replace(' ', '-').lower()}",
+        "",
+        "SUMMARY",
+        f"Software engineer with {rng.randint(2, 15)} years of experience building web platforms.",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 10)),
+        "",
+        "EDUCATION",
+        f"B.Tech Computer Science, {rng.choice(['State University', 'Institute of Technology'])}, {rng.randint(2005, 2020)}",
+        "",
+        "EXPERIENCE",
+    ]
+    length = sum(len(line) + 1 for line in lines)
+    while length < size:
+        year = rng.randint(2008, 2023)
+        block = [
+            "",
+            f"Senior Engineer, {rng.choice(COMPANIES)} ({rng.choice(MONTHS)} {year} - {rng.choice(MONTHS)} {year + rng.randint(1, 4)})",
+        ]
+        for _ in range(rng.randint(3, 6)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+            block.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(SKILLS)}, {outcome}")
+        lines.extend(block)
+        length += sum(len(line) + 1 for line in block)
+    return "\n".join(lines)[:size]
+
+
+def to_pdf(text: str, lines_per_page: int = 60) -> bytes:
+    """Render text into a PDF with a real text layer"""
+    import fitz
+    lines = text.split("\n")
+    with fitz.open() as doc:
+        for start in range(0, len(lines), lines_per_page):
+            page = doc.new_page()
+            page.insert_text((50, 50), "\n".join(lines[start:start + lines_per_page]), fontsize=9)
+        return doc.tobytes()
+
+
+def to_docx(text: str) -> bytes:
+    """A minimal DOCX with one paragraph per line, enough for docx2txt"""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in text.split("\n")
+    )
+    files = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'
+        ),
+        "word/document.xml": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}</w:body></w:document>'
+        ),
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
@@ -0,0 +1,73 @@
+"""
+Production server: gunicorn managing uvicorn workers, one per CPU by default.
+
+    gunicorn -c gunicorn.conf.py backend.main:app
+    python run.py --production
+
+The app is imported and its models (spaCy, skill tables, the job ranking
+vectorizer, the skill index) are loaded once in the parent process, which then
+forks the workers, so they share that memory copy-on-write. Workers are
+replaced after RESUMEIQ_MAX_REQUESTS requests and get graceful_timeout seconds
+to finish their requests on restart and shutdown. With more than one worker,
+suggestion streams and queued analyses are recorded in a SQLite file they all
+open (RESUMEIQ_STATE_DB), so a follow-up request can reach any of them.
+"""
+import logging
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+# Settings in .env take precedence over the per-worker defaults below
+load_dotenv()
+
+from backend.startup import available_cpus  # noqa: E402
+
+logger = logging.getLogger("gunicorn.error")
+
+# CPUs of the affinity mask and container quota, not of the whole host
+_cpus = available_cpus()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(_cpus)))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+# Restart each worker after about this many requests; the jitter keeps them from restarting together
+max_requests = int(os.getenv("RESUMEIQ_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+# Seconds a worker may go without reporting in before it is killed, and has to finish on restart
+timeout = int(os.getenv("RESUMEIQ_WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("RESUMEIQ_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+loglevel = os.getenv("RESUMEIQ_LOG_LEVEL", "INFO").lower()
+# The app writes one summary record per request (see backend.logging_setup)
+accesslog = None
+
+# Every worker would otherwise size its process pool and admission limit for the whole machine
+os.environ.setdefault("RESUMEIQ_PROCESS_WORKERS", str(max(1, _cpus // workers)))
+os.environ.setdefault("RESUMEIQ_MAX_INFLIGHT", str(max(16, 8 * _cpus // workers)))
+# Follow-up requests for suggestions and queued analyses may reach any worker, so they share their state
+if workers > 1:
+    _state_db = os.path.join(tempfile.gettempdir(), f"resumeiq-state-{bind.rsplit(':', 1)[-1]}.db")
+    os.environ.setdefault("RESUMEIQ_STATE_DB", _state_db)
+
+
+def when_ready(server):
+    """Load the models in the parent once the app is imported, before the workers are forked"""
+    from backend.startup import FAST_STARTUP, preload_for_fork
+
+    if FAST_STARTUP:
+        return
+    try:
+        preload_for_fork()
+    except Exception as e:
+        logger.warning(f"Preloading failed, workers load models themselves: {str(e)}")
+
+
+def post_fork(server, worker):
+    """Give each worker its own cache database connections"""
+    from backend.startup import after_fork
+
+    after_fork()
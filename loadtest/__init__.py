@@ -0,0 +1,8 @@
+"""
+Load testing for the ResumeIQ server against local stand-ins for JSearch and OpenAI.
+
+    python -m loadtest.stubs --port 9100                  # simulated external APIs
+    python -m loadtest.driver --concurrency 1 4 16 64     # start the servers and load them
+
+See loadtest/driver.py for the options.
+"""
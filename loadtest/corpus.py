@@ -0,0 +1,86 @@
+"""
+Upload corpus for load tests: synthetic resumes rendered as PDF, DOCX, TXT and
+PNG, built on benchmarks.synthetic so the text matches the benchmark inputs.
+
+Every upload can be made unique (see unique_variant) so the analysis cache
+never answers in place of the pipeline.
+"""
+import io
+import struct
+from typing import Dict, List, Sequence, Tuple
+
+from benchmarks.synthetic import generate_resume, to_docx, to_pdf
+
+FORMATS = ("pdf", "docx", "txt", "png")
+# A page of text; images of scanned resumes are single pages
+IMAGE_TEXT_CHARS = 2500
+
+# End of central directory record of a ZIP file without an archive comment
+_ZIP_END_RECORD = b"PK\x05\x06"
+_ZIP_END_RECORD_SIZE = 22
+
+
+def to_png(text: str, width: int = 1275, height: int = 1650) -> bytes:
+    """Render the first page of text as a 150 DPI letter-size scan"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=22)
+    except TypeError:  # Pillow < 10.1 has a single bitmap font size
+        font = ImageFont.load_default()
+    y = 60
+    for line in text.split("\n"):
+        if y > height - 60:
+            break
+        draw.text((60, y), line, fill=0, font=font)
+        y += 30
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", dpi=(150, 150))
+    return buffer.getvalue()
+
+
+def render(text: str, ext: str) -> bytes:
+    if ext == "pdf":
+        return to_pdf(text)
+    if ext == "docx":
+        return to_docx(text)
+    if ext == "png":
+        return to_png(text[:IMAGE_TEXT_CHARS])
+    return text.encode("utf-8")
+
+
+def build_corpus(formats: Sequence[str] = FORMATS, sizes: Sequence[int] = (2048, 8192),
+                 per_size: int = 5) -> List[Tuple[str, bytes]]:
+    """
+    Distinct resumes in every format and size.
+
+    Returns:
+        list: (file name, contents) pairs, formats interleaved so a corpus walked in
+              order mixes them
+    """
+    by_format: Dict[str, List[Tuple[str, bytes]]] = {ext: [] for ext in formats}
+    for size in sizes:
+        for seed in range(per_size):
+            text = generate_resume(size, seed)
+            for ext in formats:
+                by_format[ext].append((f"resume-{size}-{seed}.{ext}", render(text, ext)))
+    return [item for group in zip(*by_format.values()) for item in group]
+
+
+def unique_variant(contents: bytes, ext: str, n: int) -> bytes:
+    """
+    The same document with different bytes, so its content hash differs.
+
+    PDF, PNG and text readers ignore trailing data; a DOCX gets an archive
+    comment instead, which keeps the ZIP valid.
+    """
+    marker = f"loadtest-{n}".encode()
+    if ext == "docx" and contents[-_ZIP_END_RECORD_SIZE:-_ZIP_END_RECORD_SIZE + 4] == _ZIP_END_RECORD:
+        return contents[:-2] + struct.pack("<H", len(marker)) + marker
+    if ext == "pdf":
+        return contents + b"\n%" + marker + b"\n"
+    if ext == "txt":
+        return contents + b"\n" + marker
+    return contents + marker
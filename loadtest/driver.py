@@ -0,0 +1,263 @@
+"""
+Closed-loop load driver for /upload_resume/.
+
+For each concurrency level, that many clients upload resumes from the corpus
+back to back for a fixed time, each upload made unique so the analysis cache
+never answers. The report gives throughput, error rate and latency
+percentiles per level, and the level at which throughput stopped growing: the
+saturation point of the server.
+
+By default the driver starts the stub APIs (loadtest.stubs) and a ResumeIQ
+server wired to them, so no external quota is used:
+
+    python -m loadtest.driver --concurrency 1 2 4 8 16 32 --duration 30
+    python -m loadtest.driver --url http://localhost:8000 --formats pdf txt   # an already running server
+
+Stub options (--jsearch-latency-ms, --openai-error-rate, ...) are passed through to
+loadtest.stubs. Image uploads need tesseract on the server; leave png out of
+--formats when it is not installed.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from loadtest.corpus import FORMATS, build_corpus, unique_variant
+
+logger = logging.getLogger(__name__)
+
+# A level whose throughput grows less than this over the previous one is saturated
+SATURATION_GAIN = 1.1
+STUB_OPTIONS = ("jsearch_latency_ms", "openai_latency_ms", "latency_sigma", "jsearch_error_rate",
+                "openai_error_rate", "jobs_per_page", "description_chars", "completion_tokens")
+
+
+class LevelResult:
+    """Outcome of the uploads at one concurrency level"""
+
+    def __init__(self, concurrency: int, elapsed: float, latencies: List[float],
+                 errors: Dict[str, int]):
+        self.concurrency = concurrency
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies)
+        self.errors = errors
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        """Successful uploads per second"""
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return self.latencies[min(len(self.latencies) - 1, int(round(p / 100 * (len(self.latencies) - 1))))]
+
+    def to_dict(self) -> dict:
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "ok": len(self.latencies),
+            "errors": dict(self.errors),
+            "error_rate": round(sum(self.errors.values()) / self.requests, 4) if self.requests else 0.0,
+            "throughput_per_second": round(self.throughput, 2),
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.latencies[-1] if self.latencies else None),
+            "mean_ms": ms(statistics.fmean(self.latencies) if self.latencies else None)
+        }
+
+
+async def run_level(client, corpus: List[Tuple[str, bytes]], concurrency: int, duration: float,
+                    counter, wait_for_suggestions: bool, unique: bool = True) -> LevelResult:
+    """Keep `concurrency` uploads in flight for `duration` seconds"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    items = itertools.cycle(corpus)
+    params = {"wait_for_suggestions": "true" if wait_for_suggestions else "false"}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            filename, contents = next(items)
+            ext = filename.rsplit(".", 1)[-1]
+            if unique:
+                contents = unique_variant(contents, ext, next(counter))
+            start = time.perf_counter()
+            try:
+                response = await client.post("/upload_resume/", params=params, files={"file": (filename, contents)})
+                if response.status_code != 200:
+                    kind = f"http_{response.status_code}"
+                elif "error" in response.json():
+                    kind = f"analysis_{ext}"
+                else:
+                    latencies.append(time.perf_counter() - start)
+                    continue
+            except Exception as e:
+                kind = type(e).__name__
+            errors[kind] = errors.get(kind, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return LevelResult(concurrency, time.perf_counter() - started, latencies, errors)
+
+
+def find_saturation(results: List[LevelResult]) -> Optional[LevelResult]:
+    """The last level before throughput stopped growing by SATURATION_GAIN; None if it never stopped"""
+    for previous, current in zip(results, results[1:]):
+        if current.throughput < previous.throughput * SATURATION_GAIN:
+            return previous
+    return None
+
+
+async def run(url: str, corpus: List[Tuple[str, bytes]], levels: Sequence[int], duration: float,
+              warmup: float, wait_for_suggestions: bool, unique: bool = True) -> List[LevelResult]:
+    import httpx
+
+    counter = itertools.count()
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        if warmup > 0:
+            await run_level(client, corpus, min(levels), warmup, counter, wait_for_suggestions, unique)
+        results = []
+        for concurrency in levels:
+            result = await run_level(client, corpus, concurrency, duration, counter, wait_for_suggestions, unique)
+            summary = result.to_dict()
+            logger.info(
+                f"concurrency {concurrency:>4}   {summary['throughput_per_second']:>8.2f}/s   "
+                f"p50 {summary['p50_ms']} ms   p90 {summary['p90_ms']} ms   p99 {summary['p99_ms']} ms   "
+                f"errors {summary['error_rate']:.1%}"
+            )
+            results.append(result)
+    return results
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with status {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server for {url} did not come up within {timeout:.0f}s")
+
+
+@contextmanager
+def local_servers(port: int, stub_port: int, stub_args: List[str], server_env: Dict[str, str]):
+    """Start the stub APIs and a ResumeIQ server that calls them; yields the server URL"""
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "JSEARCH_URL": f"{stub_url}/search",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "OPENAI_API_KEY": "loadtest",
+        "RAPIDAPI_KEY": "loadtest",
+        "RESUMEIQ_LOG_LEVEL": "WARNING",
+        **server_env
+    }
+    processes = []
+    try:
+        stubs = subprocess.Popen([sys.executable, "-m", "loadtest.stubs", "--port", str(stub_port), *stub_args])
+        processes.append(stubs)
+        _wait_until_up(f"{stub_url}/stats", stubs)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+             "--port", str(port), "--no-access-log", "--log-level", "warning"],
+            env=env
+        )
+        processes.append(server)
+        _wait_until_up(f"{url}/health", server)
+        yield url
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test /upload_resume/ and find the saturation point")
+    parser.add_argument("--url", default=None, help="Server to load (default: start local servers with stub APIs)")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 2, 4, 8, 16, 32],
+                        help="Concurrent clients per level")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per level")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of load before measuring")
+    parser.add_argument("--formats", nargs="*", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--sizes", type=int, nargs="*", default=[2048, 8192], help="Resume sizes in bytes")
+    parser.add_argument("--per-size", type=int, default=5, help="Distinct resumes per size and format")
+    parser.add_argument("--defer-suggestions", action="store_true",
+                        help="Return before the AI suggestions, as the web client does")
+    parser.add_argument("--allow-cache", action="store_true", help="Upload identical bytes so the analysis cache can answer")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    parser.add_argument("--port", type=int, default=8100, help="Port of the local ResumeIQ server")
+    parser.add_argument("--stub-port", type=int, default=9100, help="Port of the local stub APIs")
+    parser.add_argument("--workers", type=int, default=None, help="RESUMEIQ_PROCESS_WORKERS of the local server")
+    for option in STUB_OPTIONS:
+        parser.add_argument(f"--{option.replace('_', '-')}", type=float, default=None, help="Passed to loadtest.stubs")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.formats, args.sizes, args.per_size)
+    logger.info(f"Corpus: {len(corpus)} resumes ({', '.join(args.formats)})")
+    levels = sorted(set(args.concurrency))
+
+    def load(url: str) -> List[LevelResult]:
+        return asyncio.run(run(url, corpus, levels, args.duration, args.warmup,
+                               not args.defer_suggestions, unique=not args.allow_cache))
+
+    if args.url:
+        results = load(args.url)
+    else:
+        stub_args = []
+        for option in STUB_OPTIONS:
+            value = getattr(args, option)
+            if value is not None:
+                stub_args += [f"--{option.replace('_', '-')}", str(int(value) if value.is_integer() else value)]
+        server_env = {"RESUMEIQ_PROCESS_WORKERS": str(args.workers)} if args.workers else {}
+        with local_servers(args.port, args.stub_port, stub_args, server_env) as url:
+            results = load(url)
+
+    saturated = find_saturation(results)
+    if saturated is not None:
+        logger.info(f"Throughput stops scaling at concurrency {saturated.concurrency}: "
+                    f"{saturated.throughput:.2f} uploads/s, p99 {saturated.to_dict()['p99_ms']} ms")
+    else:
+        logger.info(f"Throughput was still growing at concurrency {levels[-1]}; add higher levels to find saturation")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "levels": [result.to_dict() for result in results],
+                "saturation_concurrency": saturated.concurrency if saturated else None
+            }, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    logger.setLevel(logging.INFO)
+    sys.exit(main())
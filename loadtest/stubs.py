@@ -0,0 +1,209 @@
+"""
+Local stand-ins for the external APIs the analysis calls:
+
+- GET  /search               JSearch job search (point JSEARCH_URL here)
+- POST /v1/chat/completions  OpenAI chat completions, streamed or not (point OPENAI_BASE_URL at /v1)
+
+Latency is drawn from a log-normal distribution around a median, so responses
+have the long tail real APIs show. Failures are returned at a configurable rate
+(503 for JSearch, 500 for OpenAI) and payload sizes are configurable, so load
+tests measure ResumeIQ itself without spending API quota.
+
+    python -m loadtest.stubs --port 9100 --jsearch-latency-ms 400 --openai-error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+TITLES = ["Software Engineer", "Backend Developer", "Full Stack Developer", "Data Engineer",
+          "Platform Engineer", "Machine Learning Engineer", "DevOps Engineer", "Frontend Developer"]
+EMPLOYERS = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech",
+             "Hooli", "Vandelay Industries", "Cyberdyne", "Soylent"]
+CITIES = {"in": ["Bangalore", "Mumbai", "Hyderabad", "Pune"], "us": ["New York", "Seattle", "Austin", "Boston"]}
+DESCRIPTION_WORDS = (
+    "design build operate scalable services apis python java react aws docker kubernetes sql "
+    "ownership mentoring testing reliability performance customers data pipelines cloud agile"
+).split()
+CATEGORIES = ["Format and Structure", "Content and Impact", "Skills and Keywords",
+              "Professional Branding", "Action Words and Language"]
+
+
+class StubSettings:
+    """Latency, failure rate and payload size of each simulated API"""
+
+    def __init__(self, jsearch_latency_ms: float = 400, openai_latency_ms: float = 1500,
+                 latency_sigma: float = 0.5, jsearch_error_rate: float = 0.0,
+                 openai_error_rate: float = 0.0, jobs_per_page: int = 10,
+                 description_chars: int = 2000, completion_tokens: int = 300, seed: int = 0):
+        self.jsearch_latency_ms = jsearch_latency_ms
+        self.openai_latency_ms = openai_latency_ms
+        self.latency_sigma = latency_sigma
+        self.jsearch_error_rate = jsearch_error_rate
+        self.openai_error_rate = openai_error_rate
+        self.jobs_per_page = jobs_per_page
+        self.description_chars = description_chars
+        self.completion_tokens = completion_tokens
+        self.seed = seed
+
+
+def sample_latency(median_ms: float, sigma: float, rng: random.Random) -> float:
+    """Seconds drawn from a log-normal distribution with the given median"""
+    if median_ms <= 0:
+        return 0.0
+    return rng.lognormvariate(math.log(median_ms), sigma) / 1000
+
+
+def make_jobs(query: str, country: str, settings: StubSettings) -> list:
+    """JSearch listings for a query; the same query and country always give the same listings"""
+    rng = random.Random(f"{settings.seed}:{query}:{country}")
+    skill = query.replace(" developer", "")
+    jobs = []
+    for i in range(settings.jobs_per_page):
+        words = [rng.choice(DESCRIPTION_WORDS) for _ in range(settings.description_chars // 7 + 1)]
+        jobs.append({
+            "job_id": f"{country}-{rng.randrange(10 ** 8):08d}",
+            "job_title": f"{skill.title()} {rng.choice(TITLES)}",
+            "employer_name": rng.choice(EMPLOYERS),
+            "job_city": rng.choice(CITIES.get(country, CITIES["us"])),
+            "job_country": country.upper(),
+            "job_min_salary": rng.randrange(40, 200) * 1000,
+            "job_employment_type": "FULLTIME",
+            "job_apply_link": f"https://jobs.example.com/{country}/{i}?q={skill.replace(' ', '+')}",
+            "job_posted_at_datetime_utc": "2024-01-01T00:00:00.000Z",
+            "job_description": f"{skill} " + " ".join(words)[:settings.description_chars]
+        })
+    return jobs
+
+
+def make_completion(settings: StubSettings, rng: random.Random) -> str:
+    """Suggestions as a JSON object of categories, about completion_tokens tokens long"""
+    per_category = max(1, settings.completion_tokens // (len(CATEGORIES) * 12))
+    suggestions = {
+        category: [
+            " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(10)).capitalize() + "."
+            for _ in range(per_category)
+        ]
+        for category in CATEGORIES
+    }
+    return json.dumps(suggestions)
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def create_app(settings: StubSettings) -> FastAPI:
+    """The stub API server; /stats reports how many calls each endpoint served"""
+    app = FastAPI(title="ResumeIQ load-test stubs")
+    rng = random.Random(settings.seed)
+    stats = {"jsearch": 0, "jsearch_errors": 0, "openai": 0, "openai_errors": 0}
+
+    @app.get("/search")
+    async def jsearch(query: str = "developer", country: str = "us"):
+        stats["jsearch"] += 1
+        await asyncio.sleep(sample_latency(settings.jsearch_latency_ms, settings.latency_sigma, rng))
+        if rng.random() < settings.jsearch_error_rate:
+            stats["jsearch_errors"] += 1
+            return JSONResponse({"status": "ERROR", "error": "Simulated failure"}, status_code=503)
+        return {
+            "status": "OK",
+            "request_id": uuid.uuid4().hex,
+            "parameters": {"query": query, "country": country},
+            "data": make_jobs(query, country, settings)
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["openai"] += 1
+        model = body.get("model", "gpt-3.5-turbo")
+        latency = sample_latency(settings.openai_latency_ms, settings.latency_sigma, rng)
+        if rng.random() < settings.openai_error_rate:
+            stats["openai_errors"] += 1
+            await asyncio.sleep(latency * 0.3)
+            return JSONResponse({"error": {"message": "Simulated failure", "type": "server_error"}}, status_code=500)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        content = make_completion(settings, rng)
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 500, "completion_tokens": len(content) // 4, "total_tokens": 500 + len(content) // 4}
+            }
+
+        async def events():
+            # A third of the latency passes before the first token, the rest while tokens stream
+            await asyncio.sleep(latency / 3)
+            yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+            tokens = [content[i:i + 4] for i in range(0, len(content), 4)]
+            pause = (latency * 2 / 3) / max(1, len(tokens) / 8)
+            for i in range(0, len(tokens), 8):
+                await asyncio.sleep(pause)
+                for token in tokens[i:i + 8]:
+                    yield _chunk(completion_id, model, {"content": token})
+            yield _chunk(completion_id, model, {}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def call_stats():
+        return stats
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve simulated JSearch and OpenAI APIs for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--jsearch-latency-ms", type=float, default=400, help="Median JSearch response time")
+    parser.add_argument("--openai-latency-ms", type=float, default=1500, help="Median time to the end of a completion")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread; 0 for a fixed latency")
+    parser.add_argument("--jsearch-error-rate", type=float, default=0.0)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--jobs-per-page", type=int, default=10)
+    parser.add_argument("--description-chars", type=int, default=2000)
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    settings = StubSettings(
+        jsearch_latency_ms=args.jsearch_latency_ms, openai_latency_ms=args.openai_latency_ms,
+        latency_sigma=args.latency_sigma, jsearch_error_rate=args.jsearch_error_rate,
+        openai_error_rate=args.openai_error_rate, jobs_per_page=args.jobs_per_page,
+        description_chars=args.description_chars, completion_tokens=args.completion_tokens, seed=args.seed
+    )
+    logger.info(f"Stub APIs on http://{args.host}:{args.port} (JSearch /search, OpenAI /v1)")
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
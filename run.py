@@ -1,14 +1,19 @@
 import uvicorn
+import argparse
 import logging
 import os
 import sys
 import socket
 
-# Setup logging with more detailed format
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG for more detailed logs
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from dotenv import load_dotenv
+
+# .env settings (log level and format among them) apply before the backend reads its configuration
+load_dotenv()
+
+from backend.logging_setup import LOG_LEVEL, configure_logging, flush_logging
+
+# Queued, sampled logging (see backend.logging_setup); RESUMEIQ_LOG_LEVEL=DEBUG for detailed logs
+configure_logging()
 logger = logging.getLogger(__name__)
 
 def check_dependencies():
@@ -37,13 +42,27 @@ def check_port_available(port):
     except OSError:
         return False
 
+def run_production():
+    """Replace this process with gunicorn running one preloaded worker per CPU (see gunicorn.conf.py)"""
+    logger.info("Starting ResumeIQ with gunicorn workers...")
+    # Queued records would be lost with this process
+    flush_logging()
+    os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "backend.main:app"])
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start the ResumeIQ server")
+    parser.add_argument("--production", action="store_true",
+                        help="Run multiple preloaded workers with gunicorn instead of the reloading development server")
+    args = parser.parse_args()
     try:
         # Check if required directories exist
         if not check_dependencies():
             logger.error("Missing required directories. Please ensure all project directories are present.")
             sys.exit(1)
-            
+
+        if args.production:
+            run_production()
+
         # Check if port is available
         port = 8000
         if not check_port_available(port):
@@ -54,14 +73,16 @@ if __name__ == "__main__":
         logger.info(f"Server will be available at http://localhost:{port}")
         logger.info("Press Ctrl+C to stop the server")
         
-        # Run the server with more detailed logging
+        # The app configures logging itself and writes one summary record per request,
+        # so uvicorn keeps its default handlers out of the way and skips access logs
         uvicorn.run(
             "backend.main:app",
             host="localhost",
             port=port,
             reload=True,
-            log_level="debug",  # Changed to debug for more detailed logs
-            access_log=True
+            log_config=None,
+            log_level=LOG_LEVEL.lower(),
+            access_log=False
         )
     except Exception as e:
         logger.error(f"Failed to start server: {str(e)}")
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend import name_extraction
+from backend.name_extraction import extract_name, extract_names, name_from_header
+
+
+class FakeNLP:
+    """Stands in for the spaCy pipeline: tags every known name in the text as PERSON"""
+
+    def __init__(self, people=("Jane Doe", "John Smith", "Ravi Kumar")):
+        self.people = people
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        ents = [SimpleNamespace(text="Acme Corp", label_="ORG")]
+        ents += [SimpleNamespace(text=name, label_="PERSON") for name in self.people if name in text]
+        return SimpleNamespace(ents=ents)
+
+    def pipe(self, texts, batch_size=None, n_process=1):
+        return (self(text) for text in texts)
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    fake = FakeNLP()
+    monkeypatch.setattr(name_extraction, "_nlp", fake)
+    monkeypatch.setattr(name_extraction, "_nlp_loaded", True)
+    return fake
+
+
+@pytest.fixture
+def no_nlp(monkeypatch):
+    monkeypatch.setattr(name_extraction, "_nlp", None)
+    monkeypatch.setattr(name_extraction, "_nlp_loaded", True)
+
+
+@pytest.mark.parametrize("text, name", [
+    ("Jane Doe\njane@example.com\nSoftware Engineer", "Jane Doe"),
+    ("RESUME\nJane Doe\n+1 555 010 0100", "Jane Doe"),
+    ("Jane Doe | jane@example.com | +1 555 0100", "Jane Doe"),
+    ("Ravi Kumar\nlinkedin.com/in/ravikumar", "Ravi Kumar"),
+    ("Name: Jane Doe\nPython developer", "Jane Doe"),
+    ("PERSONAL DETAILS\nName: Jane Doe", "Jane Doe"),
+    ("Contact Details:\nRavi Kumar\nravi@example.com", "Ravi Kumar"),
+    ("Ludwig van Beethoven\nludwig@example.com", "Ludwig van Beethoven"),
+])
+def test_header_names(text, name):
+    assert name_from_header(text) == name
+
+
+@pytest.mark.parametrize("text", [
+    # Name-shaped lines without contact details next to them
+    "Jane Doe\nSoftware Engineer",
+    "Personal Information\nRavi Kumar",
+    "Sales Executive\nJane Doe",
+    "Marketing Coordinator\nJohn Smith",
+    "Mumbai Maharashtra\nRavi Kumar",
+    "Registered Nurse",
+    "Hyderabad Telangana",
+    "Acme Corp\n2019 - 2023",
+    # Headings and places
+    "PERSONAL DETAILS",
+    "Work History\nAcme Corp, 2019 - 2023",
+    "New York City\nJane Doe",
+    "Senior Software Engineer\nJane Doe",
+    "Professional Summary:\nExperienced engineer with 5 years in Python",
+    "",
+])
+def test_header_defers_to_model(text):
+    assert name_from_header(text) is None
+
+
+@pytest.mark.parametrize("text, name", [
+    ("New York City\nJane Doe\nPython developer", "Jane Doe"),
+    ("Sales Executive\nJane Doe", "Jane Doe"),
+    ("Marketing Coordinator\nJohn Smith", "John Smith"),
+    ("Mumbai Maharashtra\nRavi Kumar", "Ravi Kumar"),
+])
+def test_model_decides_when_header_is_not_confirmed(nlp, text, name):
+    assert extract_name(text) == name
+    assert len(nlp.calls) == 1
+
+
+def test_header_name_skips_model(nlp):
+    assert extract_name("Jane Doe\njane@example.com\nPython developer") == "Jane Doe"
+    assert nlp.calls == []
+
+
+def test_first_line_without_person(nlp):
+    assert extract_name("Work History\nAcme Corp, 2019 - 2023") == "Work History"
+
+
+def test_first_line_without_spacy(no_nlp):
+    assert extract_name("New York City\nJane Doe") == "New York City"
+
+
+def test_extract_names_matches_extract_name(nlp):
+    texts = [
+        "Jane Doe\njane@example.com",
+        "PERSONAL DETAILS\nName: Ravi Kumar",
+        "Sales Executive\nJohn Smith",
+        "New York City\nJane Doe",
+        "Work History\nAcme Corp, 2019 - 2023",
+    ]
+    names = extract_names(texts)
+    assert names == ["Jane Doe", "Ravi Kumar", "John Smith", "Jane Doe", "Work History"]
+    assert names == [extract_name(text) for text in texts]
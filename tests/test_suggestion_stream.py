@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+os.environ.setdefault("RESUMEIQ_FAST_STARTUP", "1")
+
+from backend import suggestions
+from backend.main import app
+from backend.suggestion_stream import generate_suggestions, start_suggestion_stream
+from backend.suggestions import get_fallback_suggestions, openai_breaker, stream_suggestion_tokens
+from loadtest.stubs import CATEGORIES, StubSettings, create_app
+
+RESUME = "Jane Doe\njane@example.com\nSkills: Python, AWS, Docker\nExperience: Built APIs at Acme Corp."
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    """The load-test OpenAI stand-in on a local port, with a fixed, short latency"""
+    settings = StubSettings(openai_latency_ms=150, latency_sigma=0, completion_tokens=120)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(settings), port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.02)
+    yield settings, f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(5)
+
+
+@pytest.fixture
+def stub_openai(stub_server, monkeypatch):
+    settings, url = stub_server
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(suggestions, "OPENAI_BASE_URL", f"{url}/v1")
+    # Each test runs its own event loop, so the client is rebuilt for it
+    monkeypatch.setattr(suggestions, "_async_client_loop", None)
+    monkeypatch.setattr(settings, "openai_error_rate", 0.0)
+    openai_breaker.record_success()
+    yield settings, url
+    openai_breaker.record_success()
+
+
+def _stats(url: str) -> dict:
+    return httpx.get(f"{url}/stats").json()
+
+
+def _app_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def _sse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_tokens_stream_from_the_api(stub_openai):
+    async def collect():
+        return [token async for token in stream_suggestion_tokens(RESUME)]
+
+    tokens = asyncio.run(collect())
+    assert len(tokens) > 1
+    assert set(json.loads("".join(tokens))) == set(CATEGORIES)
+
+
+def test_polling_returns_tokens_then_suggestions(stub_openai):
+    async def run():
+        stream = start_suggestion_stream(RESUME)
+        async with _app_client() as client:
+            first = (await client.get(f"/suggestions/{stream.analysis_id}")).json()
+            await stream.task
+            done = (await client.get(f"/suggestions/{stream.analysis_id}")).json()
+            resumed = (await client.get(f"/suggestions/{stream.analysis_id}", params={"since": 3})).json()
+        return stream, first, done, resumed
+
+    stream, first, done, resumed = asyncio.run(run())
+    assert first["status"] in ("pending", "streaming")
+    assert done["status"] == "complete"
+    assert done["source"] == "ai-powered"
+    assert {item["category"] for item in done["suggestions"]} == {c.replace("_", " ").title() for c in CATEGORIES}
+    assert done["tokens"] == stream.tokens
+    assert done["next"] == len(stream.tokens)
+    assert resumed["tokens"] == stream.tokens[3:]
+    assert resumed["next"] == done["next"]
+
+
+def test_event_stream_sends_tokens_and_done(stub_openai):
+    async def run():
+        stream = start_suggestion_stream(RESUME)
+        async with _app_client() as client:
+            full = await client.get(f"/suggestions/{stream.analysis_id}/stream")
+            resumed = await client.get(f"/suggestions/{stream.analysis_id}/stream", params={"since": 5})
+        return stream, full, resumed
+
+    stream, full, resumed = asyncio.run(run())
+    assert full.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(full.text)
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "done" and set(kinds[:-1]) == {"token"}
+    assert [data["text"] for kind, data in events[:-1]] == stream.tokens
+    done = events[-1][1]
+    assert done["status"] == "complete"
+    assert done["source"] == "ai-powered"
+    assert done["suggestions"] == stream.suggestions
+
+    resumed_events = _sse_events(resumed.text)
+    assert [data["text"] for kind, data in resumed_events[:-1]] == stream.tokens[5:]
+    assert resumed_events[-1][1]["suggestions"] == stream.suggestions
+
+
+def test_unknown_analysis_is_404(stub_openai):
+    async def run():
+        async with _app_client() as client:
+            return (await client.get("/suggestions/unknown")).status_code, \
+                   (await client.get("/suggestions/unknown/stream")).status_code
+
+    assert asyncio.run(run()) == (404, 404)
+
+
+def test_api_failures_fall_back_and_count_on_the_breaker(stub_openai):
+    settings, url = stub_openai
+    settings.openai_error_rate = 1.0
+    failures = openai_breaker.counters["failures"]
+
+    suggestions_list, source = asyncio.run(generate_suggestions(RESUME))
+
+    assert source == "fallback"
+    assert suggestions_list == get_fallback_suggestions()
+    assert openai_breaker.counters["failures"] == failures + 1
+
+
+def test_open_breaker_skips_the_api(stub_openai):
+    settings, url = stub_openai
+    for _ in range(openai_breaker.failure_threshold):
+        openai_breaker.record_failure()
+    calls = _stats(url)["openai"]
+
+    async def run():
+        stream = start_suggestion_stream(RESUME)
+        await stream.task
+        async with _app_client() as client:
+            return (await client.get(f"/suggestions/{stream.analysis_id}")).json()
+
+    done = asyncio.run(run())
+    assert done["status"] == "complete"
+    assert done["source"] == "fallback"
+    assert done["tokens"] == []
+    assert done["suggestions"] == get_fallback_suggestions()
+    assert _stats(url)["openai"] == calls